@@ -0,0 +1,47 @@
+"""indexes for hot query paths
+
+Some databases got tables from ``Base.metadata.create_all`` rather than from 0001, so every
+index is created only when its table exists and the index does not.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_signatures_excursion_id_student_id', 'signatures', ['excursion_id', 'student_id']),
+    ('ix_excursions_created_at_id', 'excursions', ['created_at', 'id']),
+    (
+        'ix_excursions_student_class_created_at_id',
+        'excursions',
+        ['student_class', 'created_at', 'id'],
+    ),
+    ('ix_students_student_class', 'students', ['student_class']),
+    ('ix_students_parent_email', 'students', ['parent_email']),
+    ('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at']),
+]
+
+
+def _existing_indexes():
+    inspector = sa.inspect(op.get_bind())
+    return {
+        table: {index['name'] for index in inspector.get_indexes(table)}
+        for table in inspector.get_table_names()
+    }
+
+
+def upgrade():
+    existing = _existing_indexes()
+    for name, table, columns in INDEXES:
+        if table in existing and name not in existing[table]:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    existing = _existing_indexes()
+    for name, table, _ in reversed(INDEXES):
+        if name in existing.get(table, set()):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,93 @@
+"""store excursions.date as DATE and index date range scans
+
+Existing values are parsed in Python so both ISO dates (``2024-09-15``, optionally with a time
+part) and the ``15.09.2024`` form typed in by hand are accepted; anything else aborts the
+migration with the offending ids instead of silently losing data.
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_excursions_date_id', ['date', 'id']),
+    ('ix_excursions_student_class_date_id', ['student_class', 'date', 'id']),
+]
+
+
+def parse_excursion_date(value):
+    if isinstance(value, date):
+        return value
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return datetime.strptime(value, '%d.%m.%Y').date()
+
+
+def _date_column_type(inspector):
+    if 'excursions' not in inspector.get_table_names():
+        return None
+    columns = {column['name']: column['type'] for column in inspector.get_columns('excursions')}
+    return columns['date']
+
+
+def _convert(to_type, convert):
+    bind = op.get_bind()
+    excursions = sa.table(
+        'excursions', sa.column('id', sa.Integer), sa.column('date_new', to_type)
+    )
+    rows = bind.execute(sa.text('SELECT id, date FROM excursions')).all()
+    converted, invalid = [], []
+    for excursion_id, value in rows:
+        try:
+            converted.append({'row_id': excursion_id, 'date_new': convert(value)})
+        except (TypeError, ValueError):
+            invalid.append(excursion_id)
+    if invalid:
+        raise ValueError(f'Unparseable excursions.date for ids {invalid[:20]}')
+
+    with op.batch_alter_table('excursions') as batch:
+        batch.add_column(sa.Column('date_new', to_type, nullable=True))
+    if converted:
+        bind.execute(
+            excursions.update()
+            .where(excursions.c.id == sa.bindparam('row_id'))
+            .values(date_new=sa.bindparam('date_new')),
+            converted,
+        )
+    with op.batch_alter_table('excursions') as batch:
+        batch.drop_column('date')
+        batch.alter_column('date_new', new_column_name='date', nullable=False)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    column_type = _date_column_type(inspector)
+    if column_type is None:
+        return
+    if not isinstance(column_type, sa.Date):
+        _convert(sa.Date(), parse_excursion_date)
+
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('excursions')}
+    for name, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, 'excursions', columns)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    column_type = _date_column_type(inspector)
+    if column_type is None:
+        return
+    existing = {index['name'] for index in inspector.get_indexes('excursions')}
+    for name, _ in reversed(INDEXES):
+        if name in existing:
+            op.drop_index(name, table_name='excursions')
+    if isinstance(column_type, sa.Date):
+        _convert(sa.String(), lambda value: parse_excursion_date(value).isoformat())
@@ -0,0 +1,36 @@
+"""users.token_version for access token invalidation
+
+Skipped when the column already exists (databases created with ``Base.metadata.create_all``).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def _user_columns():
+    inspector = sa.inspect(op.get_bind())
+    if 'users' not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns('users')}
+
+
+def upgrade():
+    columns = _user_columns()
+    if columns is None or 'token_version' in columns:
+        return
+    with op.batch_alter_table('users') as batch:
+        batch.add_column(
+            sa.Column('token_version', sa.Integer, nullable=False, server_default='0')
+        )
+
+
+def downgrade():
+    columns = _user_columns()
+    if columns is None or 'token_version' not in columns:
+        return
+    with op.batch_alter_table('users') as batch:
+        batch.drop_column('token_version')
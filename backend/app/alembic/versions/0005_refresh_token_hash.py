@@ -0,0 +1,89 @@
+"""store refresh tokens as sha256 hashes
+
+Existing tokens are hashed in place, so sessions survive the upgrade. A downgrade cannot
+recover the tokens from their hashes: it restores the ``token`` column, deletes every refresh
+token and users sign in again.
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+REVOKED_INDEX = 'ix_refresh_tokens_revoked_id'
+
+
+def _columns(inspector):
+    if 'refresh_tokens' not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns('refresh_tokens')}
+
+
+def _drop_indexes(inspector, column):
+    for index in inspector.get_indexes('refresh_tokens'):
+        if index['column_names'] == [column]:
+            op.drop_index(index['name'], table_name='refresh_tokens')
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = _columns(inspector)
+    if columns is None:
+        return
+
+    if 'token' in columns:
+        _drop_indexes(inspector, 'token')
+        with op.batch_alter_table('refresh_tokens') as batch:
+            batch.add_column(sa.Column('token_hash', sa.String(64), nullable=True))
+        refresh_tokens = sa.table(
+            'refresh_tokens', sa.column('id', sa.Integer), sa.column('token_hash', sa.String)
+        )
+        rows = [
+            {'row_id': token_id, 'token_hash': hashlib.sha256(token.encode()).hexdigest()}
+            for token_id, token in bind.execute(sa.text('SELECT id, token FROM refresh_tokens'))
+        ]
+        if rows:
+            bind.execute(
+                refresh_tokens.update()
+                .where(refresh_tokens.c.id == sa.bindparam('row_id'))
+                .values(token_hash=sa.bindparam('token_hash')),
+                rows,
+            )
+        with op.batch_alter_table('refresh_tokens') as batch:
+            batch.drop_column('token')
+            batch.alter_column('token_hash', existing_type=sa.String(64), nullable=False)
+        op.create_index(
+            'ix_refresh_tokens_token_hash', 'refresh_tokens', ['token_hash'], unique=True
+        )
+
+    existing = {index['name'] for index in sa.inspect(bind).get_indexes('refresh_tokens')}
+    if REVOKED_INDEX not in existing:
+        op.create_index(
+            REVOKED_INDEX,
+            'refresh_tokens',
+            ['id'],
+            sqlite_where=sa.text('revoked = 1'),
+            postgresql_where=sa.text('revoked'),
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = _columns(inspector)
+    if columns is None or 'token_hash' not in columns:
+        return
+    existing = {index['name'] for index in inspector.get_indexes('refresh_tokens')}
+    if REVOKED_INDEX in existing:
+        op.drop_index(REVOKED_INDEX, table_name='refresh_tokens')
+    _drop_indexes(inspector, 'token_hash')
+    bind.execute(sa.text('DELETE FROM refresh_tokens'))
+    with op.batch_alter_table('refresh_tokens') as batch:
+        batch.drop_column('token_hash')
+        batch.add_column(sa.Column('token', sa.String, nullable=False))
+    op.create_index('ix_refresh_tokens_token', 'refresh_tokens', ['token'], unique=True)
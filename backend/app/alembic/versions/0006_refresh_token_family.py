@@ -0,0 +1,48 @@
+"""refresh_tokens.family_id for token families
+
+Refresh tokens issued before this revision are opaque strings that the signed-token refresh
+no longer accepts; they are marked revoked so the purge removes them. A downgrade keeps the
+rows: the older code looks tokens up by hash and still accepts the signed ones.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+FAMILY_INDEX = 'ix_refresh_tokens_family_id'
+
+
+def _columns():
+    inspector = sa.inspect(op.get_bind())
+    if 'refresh_tokens' not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns('refresh_tokens')}
+
+
+def upgrade():
+    columns = _columns()
+    if columns is None or 'family_id' in columns:
+        return
+    with op.batch_alter_table('refresh_tokens') as batch:
+        batch.add_column(sa.Column('family_id', sa.String(32), nullable=True))
+    op.create_index(FAMILY_INDEX, 'refresh_tokens', ['family_id'])
+    refresh_tokens = sa.table(
+        'refresh_tokens', sa.column('family_id', sa.String), sa.column('revoked', sa.Boolean)
+    )
+    op.execute(
+        refresh_tokens.update()
+        .where(refresh_tokens.c.family_id.is_(None))
+        .values(revoked=sa.true())
+    )
+
+
+def downgrade():
+    columns = _columns()
+    if columns is None or 'family_id' not in columns:
+        return
+    op.drop_index(FAMILY_INDEX, table_name='refresh_tokens')
+    with op.batch_alter_table('refresh_tokens') as batch:
+        batch.drop_column('family_id')
@@ -1,88 +1,924 @@
+import asyncio
 import json
-from typing import Any, Iterable
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator
 
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 
 try:
     from redis import Redis
-    from redis.exceptions import RedisError
+    from redis.asyncio import Redis as AsyncRedis
+    from redis.exceptions import RedisError, WatchError
 
     REDIS_AVAILABLE = True
 except ImportError:  # pragma: no cover - optional dependency for local dev
     Redis = Any  # type: ignore
+    AsyncRedis = Any  # type: ignore
     REDIS_AVAILABLE = False
 
     class RedisError(Exception):
         """Fallback error class when redis package is unavailable."""
 
+    class WatchError(RedisError):
+        """Fallback error class when redis package is unavailable."""
+
 
+from app.cache_codecs import CacheSerializer
 from app.core.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 _cache_client: Redis | None = None
+_invalidation_listener: Any | None = None
+_async_cache_client: AsyncRedis | None = None
+_async_cache_loop: asyncio.AbstractEventLoop | None = None
 
 cache_hits = Counter(
-    "cache_hits_total", "Number of cache hits for cached responses", ["endpoint"]
+    "cache_hits_total", "Number of cache hits for cached responses", ["endpoint", "tier"]
 )
 cache_misses = Counter(
-    "cache_misses_total", "Number of cache misses for cached responses", ["endpoint"]
+    "cache_misses_total", "Number of cache misses for cached responses", ["endpoint", "tier"]
+)
+cache_build_seconds = Histogram(
+    "cache_build_seconds", "Time spent rebuilding cache entries after a miss", ["endpoint"]
 )
+redis_circuit_state = Gauge(
+    "cache_redis_circuit_state", "1 for the current state of the Redis circuit breaker", ["state"]
+)
+redis_circuit_transitions = Counter(
+    "cache_redis_circuit_transitions_total",
+    "Number of Redis circuit breaker state changes",
+    ["state"],
+)
+
+
+class CircuitBreaker:
+    """Health state machine that lets callers skip Redis while it is unreachable.
+
+    ``closed`` passes every call. After ``failure_threshold`` consecutive failures it turns
+    ``open`` and rejects calls until the probe interval elapses; the next caller becomes the
+    single ``half_open`` probe. A successful probe closes the circuit, a failed one re-opens
+    it with the interval doubled up to ``max_probe_interval``. A probe whose outcome is never
+    recorded is replaced by a new one after another ``probe_interval``.
+
+    Every caller that gets ``True`` from ``allow_request`` must report the outcome of its
+    Redis call with ``record_success`` or ``record_failure``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self, failure_threshold: int, probe_interval: float, max_probe_interval: float
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self.state = self.CLOSED
+        self.failures = 0
+        self._backoff = probe_interval
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        for state in (self.CLOSED, self.OPEN, self.HALF_OPEN):
+            redis_circuit_state.labels(state=state).set(int(state == self.state))
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning("Redis circuit breaker %s -> %s", self.state, state)
+        redis_circuit_state.labels(state=self.state).set(0)
+        redis_circuit_state.labels(state=state).set(1)
+        redis_circuit_transitions.labels(state=state).inc()
+        self.state = state
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self.state != self.CLOSED and now >= self._retry_at:
+                self._transition(self.HALF_OPEN)
+                self._retry_at = now + self.probe_interval
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        if self.state == self.CLOSED and not self.failures:
+            return
+        with self._lock:
+            self.failures = 0
+            self._backoff = self.probe_interval
+            self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self._backoff = min(self._backoff * 2, self.max_probe_interval)
+            elif self.failures < self.failure_threshold:
+                return
+            self._retry_at = time.monotonic() + self._backoff
+            self._transition(self.OPEN)
+
+
+class LocalCache:
+    """Bounded in-process LRU with per-entry expiry.
+
+    Values are shared between the threads of one worker and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any, frozenset[str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float, tags: Iterable[str] = ()) -> None:
+        if self.max_entries <= 0 or ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete_tags(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[2] & tags]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SingleFlight:
+    """Per-key locks so that only one thread of a worker rebuilds a given cache entry."""
+
+    def __init__(self) -> None:
+        self._locks: dict[str, tuple[threading.Lock, int]] = {}
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def lock(self, key: str, blocking: bool = True) -> Iterator[bool]:
+        with self._guard:
+            lock, users = self._locks.get(key, (threading.Lock(), 0))
+            self._locks[key] = (lock, users + 1)
+        acquired = lock.acquire(blocking=blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+            with self._guard:
+                lock, users = self._locks[key]
+                if users == 1:
+                    del self._locks[key]
+                else:
+                    self._locks[key] = (lock, users - 1)
+
+
+class AsyncSingleFlight:
+    """Per-key asyncio locks, the event-loop counterpart of ``SingleFlight``."""
+
+    def __init__(self) -> None:
+        self._locks: dict[str, tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def lock(self, key: str, blocking: bool = True) -> AsyncIterator[bool]:
+        lock, users = self._locks.get(key, (asyncio.Lock(), 0))
+        self._locks[key] = (lock, users + 1)
+        acquired = False
+        try:
+            if blocking or not lock.locked():
+                acquired = await lock.acquire()
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+
+local_cache = LocalCache(settings.cache_local_max_entries)
+serializer = CacheSerializer(
+    settings.cache_codec, settings.cache_compression, settings.cache_compression_min_bytes
+)
+single_flight = SingleFlight()
+async_single_flight = AsyncSingleFlight()
+redis_breaker = CircuitBreaker(
+    settings.redis_failure_threshold,
+    settings.redis_probe_interval_seconds,
+    settings.redis_max_probe_interval_seconds,
+)
+
+
+def _handle_invalidation_message(message: dict) -> None:
+    try:
+        payload = json.loads(message["data"])
+    except (KeyError, TypeError, ValueError):
+        return
+    local_cache.delete(payload.get("keys", []))
+    local_cache.delete_tags(payload.get("tags", []))
+
+
+def _handle_listener_error(exc: BaseException, pubsub: Any, thread: Any) -> None:
+    global _cache_client, _invalidation_listener
+    logger.warning("Cache invalidation listener stopped: %s", exc)
+    # Invalidations published while we were disconnected are lost, so the local tier
+    # cannot be trusted anymore and stays off until a reconnect restarts the listener.
+    if _invalidation_listener is thread:
+        _invalidation_listener = None
+        _cache_client = None
+    local_cache.clear()
+    redis_breaker.record_failure()
+    thread.stop()
+
+
+def _start_invalidation_listener(client: Redis) -> None:
+    """Subscribe ``client`` to invalidations, replacing the listener of a previous client."""
+    global _invalidation_listener
+    previous, _invalidation_listener = _invalidation_listener, None
+    if previous is not None:
+        previous.stop()
+
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{settings.cache_invalidation_channel: _handle_invalidation_message})
+    _invalidation_listener = pubsub.run_in_thread(
+        sleep_time=1.0, daemon=True, exception_handler=_handle_listener_error
+    )
+
+
+def redis_available() -> bool:
+    """Ping Redis through the breaker; when half-open the ping is the probe."""
+    client = get_cache_client()
+    if not client:
+        return False
+
+    try:
+        client.ping()
+    except RedisError:
+        redis_breaker.record_failure()
+        return False
+    redis_breaker.record_success()
+    return True
+
+
+def _local_tier_active() -> bool:
+    """Whether this worker hears invalidations, without which its local copies would go stale."""
+    return _invalidation_listener is not None
+
+
+def _local_set(key: str, value: Any, ttl_seconds: float, tags: Iterable[str] = ()) -> None:
+    if _local_tier_active():
+        local_cache.set(key, value, ttl_seconds, tags)
+
+
+def _redis_options() -> dict[str, Any]:
+    return {
+        "decode_responses": False,
+        "max_connections": settings.redis_max_connections,
+        "socket_timeout": settings.redis_socket_timeout_seconds,
+        "socket_connect_timeout": settings.redis_socket_connect_timeout_seconds,
+    }
 
 
 def get_cache_client() -> Redis | None:
     global _cache_client
-    if not REDIS_AVAILABLE:
+    if not REDIS_AVAILABLE or not redis_breaker.allow_request():
         return None
     if _cache_client is not None:
         return _cache_client
 
     try:
-        _cache_client = Redis.from_url(settings.redis_url, decode_responses=True)
+        _cache_client = Redis.from_url(settings.redis_url, **_redis_options())
         _cache_client.ping()
+        _start_invalidation_listener(_cache_client)
     except RedisError:
         _cache_client = None
+        redis_breaker.record_failure()
+        return None
 
+    redis_breaker.record_success()
     return _cache_client
 
 
+def _local_lookup(key: str, endpoint: str) -> Any | None:
+    value = local_cache.get(key)
+    if value is not None:
+        cache_hits.labels(endpoint=endpoint, tier="local").inc()
+    else:
+        cache_misses.labels(endpoint=endpoint, tier="local").inc()
+    return value
+
+
+def _decode_entry(
+    key: str, endpoint: str, cached_value: bytes | None, ttl_ms: int, stale_ttl_seconds: int
+) -> tuple[Any | None, bool]:
+    if cached_value is None:
+        cache_misses.labels(endpoint=endpoint, tier="redis").inc()
+        return None, False
+
+    try:
+        value = serializer.loads(cached_value)
+    except ValueError:
+        return None, False
+
+    fresh_seconds = ttl_ms / 1000 - stale_ttl_seconds if ttl_ms >= 0 else None
+    if fresh_seconds is not None and fresh_seconds <= 0:
+        cache_hits.labels(endpoint=endpoint, tier="stale").inc()
+        return value, False
+
+    cache_hits.labels(endpoint=endpoint, tier="redis").inc()
+    local_ttl = settings.cache_local_ttl_seconds
+    _local_set(key, value, min(local_ttl, fresh_seconds) if fresh_seconds else local_ttl)
+    return value, True
+
+
+def _lookup(key: str, endpoint: str, stale_ttl_seconds: int = 0) -> tuple[Any | None, bool]:
+    """Return ``(value, is_fresh)``; entries inside their stale window come back as not fresh."""
+    value = _local_lookup(key, endpoint)
+    if value is not None:
+        return value, True
+
+    client = get_cache_client()
+    if not client:
+        return None, False
+
+    try:
+        pipeline = client.pipeline(transaction=False)
+        pipeline.get(key)
+        pipeline.pttl(key)
+        cached_value, ttl_ms = pipeline.execute()
+    except RedisError:
+        redis_breaker.record_failure()
+        return None, False
+    redis_breaker.record_success()
+    return _decode_entry(key, endpoint, cached_value, ttl_ms, stale_ttl_seconds)
+
+
 def get_cached_response(key: str, endpoint: str) -> Any | None:
+    value, _ = _lookup(key, endpoint)
+    return value
+
+
+def _tag_key(tag: str) -> str:
+    return f"cache:tag:{tag}"
+
+
+def _add_to_tags(pipeline: Any, key: str, tags: Iterable[str], ttl_seconds: int) -> None:
+    # A tag set must outlive every entry it points to, otherwise invalidate_tags would miss
+    # them; it is refreshed on each write, so only sets of untouched entries expire.
+    tag_ttl = max(ttl_seconds, settings.cache_tag_ttl_seconds)
+    for tag in tags:
+        pipeline.sadd(_tag_key(tag), key)
+        pipeline.expire(_tag_key(tag), tag_ttl)
+
+
+def _queue_set(pipeline: Any, key: str, value: Any, ttl_seconds: int, tags: Iterable[str]) -> None:
+    pipeline.setex(key, ttl_seconds, serializer.dumps(value))
+    _add_to_tags(pipeline, key, tags, ttl_seconds)
+
+
+def _queue_invalidation(
+    pipeline: Any, keys: list[str], tags: list[str], batch_size: int = 500
+) -> None:
+    for start in range(0, len(keys), batch_size):
+        pipeline.delete(*keys[start : start + batch_size])
+    if tags:
+        pipeline.delete(*[_tag_key(tag) for tag in tags])
+    payload = {"keys": keys, "tags": tags} if tags else {"keys": keys}
+    pipeline.publish(settings.cache_invalidation_channel, json.dumps(payload))
+
+
+def set_cached_response(
+    key: str,
+    value: Any,
+    ttl_seconds: int | None = None,
+    stale_ttl_seconds: int = 0,
+    tags: Iterable[str] = (),
+) -> None:
+    ttl_seconds = ttl_seconds or settings.cache_ttl_seconds
+    tags = list(tags)
     client = get_cache_client()
     if not client:
-        return None
+        return
+
+    _local_set(key, value, min(ttl_seconds, settings.cache_local_ttl_seconds), tags)
 
     try:
-        cached_value = client.get(key)
+        pipeline = client.pipeline(transaction=False)
+        _queue_set(pipeline, key, value, ttl_seconds + stale_ttl_seconds, tags)
+        pipeline.execute()
     except RedisError:
-        return None
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
 
-    if cached_value is None:
-        cache_misses.labels(endpoint=endpoint).inc()
-        return None
 
-    cache_hits.labels(endpoint=endpoint).inc()
+def _acquire_build_lock(key: str) -> str | None:
+    """Take the cross-worker rebuild lock for ``key``; without Redis the local lock suffices."""
+    token = uuid.uuid4().hex
+    client = get_cache_client()
+    if not client:
+        return token
+
     try:
-        return json.loads(cached_value)
-    except json.JSONDecodeError:
-        return None
+        acquired = client.set(f"lock:{key}", token, nx=True, px=_lock_timeout_ms())
+    except RedisError:
+        redis_breaker.record_failure()
+        return token
+    redis_breaker.record_success()
+    return token if acquired else None
+
+
+def _lock_timeout_ms() -> int:
+    return int(settings.cache_lock_timeout_seconds * 1000)
+
+
+def _release_build_lock(key: str, token: str) -> None:
+    client = get_cache_client()
+    if not client:
+        return
+
+    lock_key = f"lock:{key}"
+    try:
+        with client.pipeline() as pipeline:
+            pipeline.watch(lock_key)
+            if pipeline.get(lock_key) == token.encode():
+                pipeline.multi()
+                pipeline.delete(lock_key)
+                pipeline.execute()
+            else:
+                pipeline.unwatch()
+    except WatchError:
+        pass  # the lock expired and was taken over; Redis itself answered
+    except RedisError:
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+
+def _wait_for_rebuild(key: str, endpoint: str) -> Any | None:
+    deadline = time.monotonic() + settings.cache_lock_wait_seconds
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        value, _ = _lookup(key, endpoint)
+        if value is not None:
+            return value
+    return None
 
 
-def set_cached_response(key: str, value: Any, ttl_seconds: int | None = None) -> None:
+def _rebuild(
+    key: str,
+    endpoint: str,
+    builder: Callable[[], Any],
+    ttl_seconds: int | None,
+    stale_ttl_seconds: int,
+    tags: Iterable[str],
+) -> Any:
+    with cache_build_seconds.labels(endpoint=endpoint).time():
+        value = builder()
+    set_cached_response(key, value, ttl_seconds, stale_ttl_seconds, tags)
+    return value
+
+
+def get_or_set_cached_response(
+    key: str,
+    endpoint: str,
+    builder: Callable[[], Any],
+    ttl_seconds: int | None = None,
+    stale_ttl_seconds: int | None = None,
+    tags: Iterable[str] = (),
+) -> Any:
+    """Return the cached value for ``key`` or build it exactly once across all workers.
+
+    Concurrent misses wait for the single builder instead of running ``builder`` themselves.
+    Within ``stale_ttl_seconds`` after expiry the old value keeps being served while one
+    caller rebuilds it. ``tags`` are attached to the stored entry, see ``invalidate_tags``.
+    """
+    if stale_ttl_seconds is None:
+        stale_ttl_seconds = settings.cache_stale_ttl_seconds
+
+    value, fresh = _lookup(key, endpoint, stale_ttl_seconds)
+    if fresh:
+        return value
+
+    if value is not None:
+        with single_flight.lock(key, blocking=False) as acquired:
+            token = _acquire_build_lock(key) if acquired else None
+            if token is None:
+                return value
+            try:
+                return _rebuild(key, endpoint, builder, ttl_seconds, stale_ttl_seconds, tags)
+            finally:
+                _release_build_lock(key, token)
+
+    with single_flight.lock(key):
+        value, _ = _lookup(key, endpoint, stale_ttl_seconds)
+        if value is not None:
+            return value
+
+        token = _acquire_build_lock(key)
+        if token is None:
+            value = _wait_for_rebuild(key, endpoint)
+            if value is not None:
+                return value
+        try:
+            return _rebuild(key, endpoint, builder, ttl_seconds, stale_ttl_seconds, tags)
+        finally:
+            if token is not None:
+                _release_build_lock(key, token)
+
+
+def get_many(keys: Iterable[str], endpoint: str) -> dict[str, Any]:
+    """Return the cached values for ``keys`` with a single MGET; missing keys are left out."""
+    found: dict[str, Any] = {}
+    missing: list[str] = []
+    for key in keys:
+        value = local_cache.get(key)
+        if value is None:
+            missing.append(key)
+            continue
+        found[key] = value
+    cache_hits.labels(endpoint=endpoint, tier="local").inc(len(found))
+    cache_misses.labels(endpoint=endpoint, tier="local").inc(len(missing))
+    if not missing:
+        return found
+
+    client = get_cache_client()
+    if not client:
+        return found
+
+    try:
+        cached_values = client.mget(missing)
+    except RedisError:
+        redis_breaker.record_failure()
+        return found
+    redis_breaker.record_success()
+
+    for key, cached_value in zip(missing, cached_values):
+        if cached_value is None:
+            cache_misses.labels(endpoint=endpoint, tier="redis").inc()
+            continue
+        try:
+            value = serializer.loads(cached_value)
+        except ValueError:
+            continue
+        cache_hits.labels(endpoint=endpoint, tier="redis").inc()
+        _local_set(key, value, settings.cache_local_ttl_seconds)
+        found[key] = value
+    return found
+
+
+def set_many(
+    items: dict[str, Any],
+    ttl_seconds: int | None = None,
+    tags: dict[str, Iterable[str]] | None = None,
+) -> None:
+    """Write several entries in one pipelined round trip; ``tags`` maps keys to their tags.
+
+    Only Redis is filled: bulk writes are usually warm-ups, and pushing them into the local
+    LRU would evict the entries that are actually hot on this worker.
+    """
+    if not items:
+        return
     client = get_cache_client()
     if not client:
         return
 
+    ttl_seconds = ttl_seconds or settings.cache_ttl_seconds
+    tags = tags or {}
     try:
-        client.setex(key, ttl_seconds or settings.cache_ttl_seconds, json.dumps(value, default=str))
+        pipeline = client.pipeline(transaction=False)
+        for key, value in items.items():
+            _queue_set(pipeline, key, value, ttl_seconds, tags.get(key, ()))
+        pipeline.execute()
     except RedisError:
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+
+def invalidate_many(keys: Iterable[str], batch_size: int = 500) -> None:
+    """Drop ``keys`` from every tier on all workers using one pipelined round trip."""
+    keys = list(keys)
+    if not keys:
         return
+    local_cache.delete(keys)
+
+    client = get_cache_client()
+    if not client:
+        return
+
+    try:
+        pipeline = client.pipeline(transaction=False)
+        _queue_invalidation(pipeline, keys, [], batch_size)
+        pipeline.execute()
+    except RedisError:
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
 
 
 def invalidate_cache(keys: Iterable[str]) -> None:
+    invalidate_many(keys)
+
+
+def invalidate_tags(tags: Iterable[str], batch_size: int = 500) -> None:
+    """Drop every entry stored with any of ``tags``, on all tiers and workers."""
+    tags = list(tags)
+    if not tags:
+        return
+    local_cache.delete_tags(tags)
+
     client = get_cache_client()
     if not client:
         return
 
+    tag_keys = [_tag_key(tag) for tag in tags]
+    try:
+        keys = sorted(key.decode() for key in client.sunion(tag_keys))
+        local_cache.delete(keys)
+        pipeline = client.pipeline(transaction=False)
+        _queue_invalidation(pipeline, keys, tags, batch_size)
+        pipeline.execute()
+    except RedisError:
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+
+async def get_async_cache_client() -> AsyncRedis | None:
+    """Pooled ``redis.asyncio`` client for the running event loop, guarded by the breaker."""
+    global _async_cache_client, _async_cache_loop
+    if not REDIS_AVAILABLE or not redis_breaker.allow_request():
+        return None
+    loop = asyncio.get_running_loop()
+    if _async_cache_client is not None and _async_cache_loop is loop:
+        return _async_cache_client
+
+    try:
+        client = AsyncRedis.from_url(settings.redis_url, **_redis_options())
+        await client.ping()
+    except RedisError:
+        redis_breaker.record_failure()
+        return None
+
+    redis_breaker.record_success()
+    _async_cache_client, _async_cache_loop = client, loop
+    # The local tier is only safe while this worker listens for invalidations.
+    await asyncio.to_thread(get_cache_client)
+    return client
+
+
+async def _alookup(key: str, endpoint: str, stale_ttl_seconds: int = 0) -> tuple[Any | None, bool]:
+    value = _local_lookup(key, endpoint)
+    if value is not None:
+        return value, True
+
+    client = await get_async_cache_client()
+    if not client:
+        return None, False
+
+    try:
+        pipeline = client.pipeline(transaction=False)
+        pipeline.get(key)
+        pipeline.pttl(key)
+        cached_value, ttl_ms = await pipeline.execute()
+    except RedisError:
+        redis_breaker.record_failure()
+        return None, False
+    redis_breaker.record_success()
+    return _decode_entry(key, endpoint, cached_value, ttl_ms, stale_ttl_seconds)
+
+
+async def aget(key: str, endpoint: str) -> Any | None:
+    value, _ = await _alookup(key, endpoint)
+    return value
+
+
+async def aset(
+    key: str,
+    value: Any,
+    ttl_seconds: int | None = None,
+    stale_ttl_seconds: int = 0,
+    tags: Iterable[str] = (),
+) -> None:
+    ttl_seconds = ttl_seconds or settings.cache_ttl_seconds
+    tags = list(tags)
+    client = await get_async_cache_client()
+    if not client:
+        return
+
+    _local_set(key, value, min(ttl_seconds, settings.cache_local_ttl_seconds), tags)
+
     try:
-        client.delete(*keys)
+        pipeline = client.pipeline(transaction=False)
+        _queue_set(pipeline, key, value, ttl_seconds + stale_ttl_seconds, tags)
+        await pipeline.execute()
     except RedisError:
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+
+async def aset_many(
+    items: dict[str, Any],
+    ttl_seconds: int | None = None,
+    tags: dict[str, Iterable[str]] | None = None,
+) -> None:
+    if not items:
+        return
+    client = await get_async_cache_client()
+    if not client:
+        return
+
+    ttl_seconds = ttl_seconds or settings.cache_ttl_seconds
+    tags = tags or {}
+    try:
+        pipeline = client.pipeline(transaction=False)
+        for key, value in items.items():
+            _queue_set(pipeline, key, value, ttl_seconds, tags.get(key, ()))
+        await pipeline.execute()
+    except RedisError:
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+
+async def ainvalidate(keys: Iterable[str], batch_size: int = 500) -> None:
+    keys = list(keys)
+    if not keys:
+        return
+    local_cache.delete(keys)
+
+    client = await get_async_cache_client()
+    if not client:
+        return
+
+    try:
+        pipeline = client.pipeline(transaction=False)
+        _queue_invalidation(pipeline, keys, [], batch_size)
+        await pipeline.execute()
+    except RedisError:
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+
+async def ainvalidate_tags(tags: Iterable[str], batch_size: int = 500) -> None:
+    tags = list(tags)
+    if not tags:
+        return
+    local_cache.delete_tags(tags)
+
+    client = await get_async_cache_client()
+    if not client:
         return
+
+    try:
+        keys = sorted(key.decode() for key in await client.sunion([_tag_key(t) for t in tags]))
+        local_cache.delete(keys)
+        pipeline = client.pipeline(transaction=False)
+        _queue_invalidation(pipeline, keys, tags, batch_size)
+        await pipeline.execute()
+    except RedisError:
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+
+async def _aacquire_build_lock(key: str) -> str | None:
+    token = uuid.uuid4().hex
+    client = await get_async_cache_client()
+    if not client:
+        return token
+
+    try:
+        acquired = await client.set(f"lock:{key}", token, nx=True, px=_lock_timeout_ms())
+    except RedisError:
+        redis_breaker.record_failure()
+        return token
+    redis_breaker.record_success()
+    return token if acquired else None
+
+
+async def _arelease_build_lock(key: str, token: str) -> None:
+    client = await get_async_cache_client()
+    if not client:
+        return
+
+    lock_key = f"lock:{key}"
+    try:
+        async with client.pipeline() as pipeline:
+            await pipeline.watch(lock_key)
+            if await pipeline.get(lock_key) == token.encode():
+                pipeline.multi()
+                pipeline.delete(lock_key)
+                await pipeline.execute()
+            else:
+                await pipeline.unwatch()
+    except WatchError:
+        pass  # the lock expired and was taken over; Redis itself answered
+    except RedisError:
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+
+async def _await_rebuild(key: str, endpoint: str) -> Any | None:
+    deadline = time.monotonic() + settings.cache_lock_wait_seconds
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        value, _ = await _alookup(key, endpoint)
+        if value is not None:
+            return value
+    return None
+
+
+async def _arebuild(
+    key: str,
+    endpoint: str,
+    builder: Callable[[], Awaitable[Any]],
+    ttl_seconds: int | None,
+    stale_ttl_seconds: int,
+    tags: Iterable[str],
+) -> Any:
+    with cache_build_seconds.labels(endpoint=endpoint).time():
+        value = await builder()
+    await aset(key, value, ttl_seconds, stale_ttl_seconds, tags)
+    return value
+
+
+async def aget_or_set_cached_response(
+    key: str,
+    endpoint: str,
+    builder: Callable[[], Awaitable[Any]],
+    ttl_seconds: int | None = None,
+    stale_ttl_seconds: int | None = None,
+    tags: Iterable[str] = (),
+) -> Any:
+    """Async counterpart of ``get_or_set_cached_response`` for routes running on the loop."""
+    if stale_ttl_seconds is None:
+        stale_ttl_seconds = settings.cache_stale_ttl_seconds
+
+    value, fresh = await _alookup(key, endpoint, stale_ttl_seconds)
+    if fresh:
+        return value
+
+    if value is not None:
+        async with async_single_flight.lock(key, blocking=False) as acquired:
+            token = await _aacquire_build_lock(key) if acquired else None
+            if token is None:
+                return value
+            try:
+                return await _arebuild(key, endpoint, builder, ttl_seconds, stale_ttl_seconds, tags)
+            finally:
+                await _arelease_build_lock(key, token)
+
+    async with async_single_flight.lock(key):
+        value, _ = await _alookup(key, endpoint, stale_ttl_seconds)
+        if value is not None:
+            return value
+
+        token = await _aacquire_build_lock(key)
+        if token is None:
+            value = await _await_rebuild(key, endpoint)
+            if value is not None:
+                return value
+        try:
+            return await _arebuild(key, endpoint, builder, ttl_seconds, stale_ttl_seconds, tags)
+        finally:
+            if token is not None:
+                await _arelease_build_lock(key, token)
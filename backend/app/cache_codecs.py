@@ -0,0 +1,123 @@
+"""Binary encoding of cached payloads.
+
+Every stored value starts with one header byte: the low three bits name the codec and the
+next two bits the compression. Header bytes stay below 0x20, so values written before the
+header existed (plain ``json.dumps`` text) are still recognised and decoded as JSON. Codecs
+or compression can therefore be switched without flushing Redis.
+"""
+
+import json
+import zlib
+from typing import Any, Callable
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+
+class Codec:
+    def __init__(
+        self, name: str, codec_id: int, dumps: Callable[[Any], bytes], loads: Callable[[bytes], Any]
+    ) -> None:
+        self.name = name
+        self.codec_id = codec_id
+        self.dumps = dumps
+        self.loads = loads
+
+
+class Compression:
+    def __init__(
+        self,
+        name: str,
+        compression_id: int,
+        compress: Callable[[bytes], bytes],
+        decompress: Callable[[bytes], bytes],
+    ) -> None:
+        self.name = name
+        self.compression_id = compression_id
+        self.compress = compress
+        self.decompress = decompress
+
+
+CODECS: dict[str, Codec] = {
+    "json": Codec(
+        "json",
+        1,
+        lambda value: json.dumps(value, default=str, separators=(",", ":")).encode(),
+        json.loads,
+    ),
+}
+if orjson is not None:
+    CODECS["orjson"] = Codec(
+        "orjson",
+        2,
+        lambda value: orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS),
+        orjson.loads,
+    )
+if msgpack is not None:
+    CODECS["msgpack"] = Codec(
+        "msgpack",
+        3,
+        lambda value: msgpack.packb(value, default=str, use_bin_type=True, datetime=False),
+        lambda data: msgpack.unpackb(data, raw=False),
+    )
+
+COMPRESSIONS: dict[str, Compression] = {
+    "none": Compression("none", 0, lambda data: data, lambda data: data),
+    "zlib": Compression("zlib", 1, lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+if lz4_frame is not None:
+    COMPRESSIONS["lz4"] = Compression("lz4", 2, lz4_frame.compress, lz4_frame.decompress)
+
+_CODECS_BY_ID = {codec.codec_id: codec for codec in CODECS.values()}
+_COMPRESSIONS_BY_ID = {
+    compression.compression_id: compression for compression in COMPRESSIONS.values()
+}
+
+
+class CacheSerializer:
+    """Encodes values with the configured codec and decodes anything written by any codec."""
+
+    def __init__(self, codec: str, compression: str, compression_min_bytes: int) -> None:
+        # Fall back to what is installed instead of failing at import time.
+        self.codec = CODECS.get(codec, CODECS["json"])
+        self.compression = COMPRESSIONS.get(compression, COMPRESSIONS["zlib"])
+        self.compression_min_bytes = compression_min_bytes
+
+    def dumps(self, value: Any) -> bytes:
+        data = self.codec.dumps(value)
+        compression = COMPRESSIONS["none"]
+        if len(data) >= self.compression_min_bytes:
+            compression = self.compression
+        header = self.codec.codec_id | compression.compression_id << 3
+        return bytes([header]) + compression.compress(data)
+
+    def loads(self, data: bytes | str) -> Any:
+        """Decode a stored value; raises ``ValueError`` for unknown or corrupt payloads."""
+        if isinstance(data, str):
+            data = data.encode()
+        if not data:
+            raise ValueError("Empty cache payload")
+        header = data[0]
+        if header >= 0x20:
+            return json.loads(data)
+
+        codec = _CODECS_BY_ID.get(header & 0b111)
+        compression = _COMPRESSIONS_BY_ID.get(header >> 3)
+        if codec is None or compression is None:
+            raise ValueError(f"Unsupported cache payload header {header:#04x}")
+        try:
+            return codec.loads(compression.decompress(data[1:]))
+        except Exception as exc:  # every codec raises its own error types
+            raise ValueError("Corrupt cache payload") from exc
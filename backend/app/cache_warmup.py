@@ -0,0 +1,109 @@
+"""Fill the hottest response-cache entries after a deploy or a Redis flush."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from urllib.parse import urlencode
+
+from prometheus_client import Gauge
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.cache import redis_available, set_many
+from app.core.config import get_settings
+from app.db import SessionLocal
+from app.dependencies.cache import endpoint_cache_key, render_cache_entry
+from app.routes.teacher import excursion_cache_entry
+from app.services.excursions import DEFAULT_PAGE_SIZE, excursion_page, excursion_page_query
+from app.services.feature_flags import list_feature_flags
+
+logger = logging.getLogger(__name__)
+
+warmup_keys = Gauge(
+    "cache_warmup_keys", "Number of cache entries written by the last warm-up", ["group"]
+)
+warmup_duration = Gauge("cache_warmup_duration_seconds", "Duration of the last cache warm-up")
+
+_excursion_page = TypeAdapter(schemas.ExcursionPage)
+_feature_flag_list = TypeAdapter(list[schemas.FeatureFlagOut])
+
+
+def _render(adapter: TypeAdapter, value) -> dict[str, str]:
+    validated = adapter.validate_python(value, from_attributes=True)
+    return render_cache_entry(adapter.dump_json(validated))
+
+
+def warm_cache(db: Session, excursion_limit: int | None = None) -> dict[str, int]:
+    """Write first excursion pages, the latest excursion details and flags in one pipeline.
+
+    First pages are warmed for the unfiltered list and for every class. Entries use the same
+    keys, format and tags as the ``cached_endpoint`` routes serving them.
+    Returns the number of keys written per group.
+    """
+    settings = get_settings()
+    if excursion_limit is None:
+        excursion_limit = settings.cache_warmup_excursions
+    if not redis_available():
+        logger.info("Cache warm-up skipped: Redis is unavailable")
+        return {}
+
+    started = time.perf_counter()
+    entries: dict[str, dict[str, str]] = {}
+    tags: dict[str, list[str]] = {}
+
+    classes = db.scalars(select(models.Excursion.student_class).distinct()).all()
+    for student_class in [None, *classes]:
+        rows = db.scalars(excursion_page_query(student_class=student_class)).all()
+        query = urlencode([("student_class", student_class)]) if student_class else ""
+        list_key = endpoint_cache_key("teacher_excursions", "/teacher/excursions", query=query)
+        entries[list_key] = _render(_excursion_page, excursion_page(rows, DEFAULT_PAGE_SIZE))
+        tags[list_key] = ["excursions"]
+
+    excursions = db.scalars(excursion_page_query(limit=excursion_limit)).all()[:excursion_limit]
+    for excursion in excursions:
+        key, entry = excursion_cache_entry(excursion)
+        entries[key] = entry
+        tags[key] = [f"excursion:{excursion.id}"]
+
+    flags_key = endpoint_cache_key("feature_flags", "/feature-flags", role="anonymous")
+    entries[flags_key] = _render(_feature_flag_list, list(list_feature_flags(db)))
+    tags[flags_key] = ["feature_flags"]
+
+    set_many(entries, tags=tags)
+
+    counts = {
+        "excursion_pages": len(classes) + 1,
+        "excursion_details": len(excursions),
+        "feature_flags": 1,
+    }
+    duration = time.perf_counter() - started
+    for group, count in counts.items():
+        warmup_keys.labels(group=group).set(count)
+    warmup_duration.set(duration)
+    logger.info(
+        "Cache warm-up finished",
+        extra={"keys": len(entries), "duration_seconds": round(duration, 3), **counts},
+    )
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--excursions",
+        type=int,
+        default=None,
+        help="number of most recent excursion details to warm (CACHE_WARMUP_EXCURSIONS)",
+    )
+    args = parser.parse_args()
+    with SessionLocal(info={"read_only": True}) as db:
+        counts = warm_cache(db, args.excursions)
+    print(f"Warmed cache keys: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,41 @@ import os
 from dataclasses import dataclass
 from functools import lru_cache
 import json
-from typing import Dict
+from typing import Dict, List
 from pydantic import validator
 
 
 @dataclass
 class Settings:
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./data.db")
+    async_database_url: str = os.getenv("ASYNC_DATABASE_URL", "")
+    database_replica_urls: List[str] = None
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    sqlite_profile_enabled: bool = os.getenv("SQLITE_PROFILE_ENABLED", "true").lower() == "true"
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    sqlite_mmap_size_bytes: int = int(os.getenv("SQLITE_MMAP_SIZE_BYTES", str(256 * 1024 * 1024)))
+    sqlite_cache_size_kib: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "16384"))
+    sqlite_reader_pool_size: int = int(os.getenv("SQLITE_READER_POOL_SIZE", "4"))
+    sql_repeat_threshold: int = int(os.getenv("SQL_REPEAT_THRESHOLD", "10"))
+    slow_query_threshold_ms: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+    slow_query_explain_sample_rate: float = float(
+        os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.1")
+    )
+    slow_query_buffer_size: int = int(os.getenv("SLOW_QUERY_BUFFER_SIZE", "200"))
+    database_replica_sticky_seconds: int = int(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "5"))
     secret_key: str = os.getenv("SECRET_KEY", "change-me")
     algorithm: str = os.getenv("ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
+    refresh_token_purge_interval_seconds: float = float(
+        os.getenv("REFRESH_TOKEN_PURGE_INTERVAL_SECONDS", "3600")
+    )
+    refresh_token_purge_batch_size: int = int(os.getenv("REFRESH_TOKEN_PURGE_BATCH_SIZE", "1000"))
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    auth_user_cache_ttl_seconds: int = int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
     refresh_token_expire_days: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
     pdf_storage_root: str = os.getenv("PDF_STORAGE_ROOT", "archive")
     reminder_hours: int = int(os.getenv("REMINDER_HOURS", "24"))
@@ -20,12 +45,37 @@ class Settings:
     otlp_endpoint: str = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
     enable_tracing: bool = os.getenv("ENABLE_TRACING", "true").lower() == "true"
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    redis_max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    redis_socket_timeout_seconds: float = float(os.getenv("REDIS_SOCKET_TIMEOUT_SECONDS", "0.5"))
+    redis_socket_connect_timeout_seconds: float = float(
+        os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS", "0.5")
+    )
+    redis_failure_threshold: int = int(os.getenv("REDIS_FAILURE_THRESHOLD", "3"))
+    redis_probe_interval_seconds: float = float(os.getenv("REDIS_PROBE_INTERVAL_SECONDS", "5"))
+    redis_max_probe_interval_seconds: float = float(
+        os.getenv("REDIS_MAX_PROBE_INTERVAL_SECONDS", "60")
+    )
     cache_ttl_seconds: int = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+    cache_local_max_entries: int = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1024"))
+    cache_local_ttl_seconds: int = int(os.getenv("CACHE_LOCAL_TTL_SECONDS", "5"))
+    cache_stale_ttl_seconds: int = int(os.getenv("CACHE_STALE_TTL_SECONDS", "0"))
+    cache_lock_timeout_seconds: float = float(os.getenv("CACHE_LOCK_TIMEOUT_SECONDS", "10"))
+    cache_lock_wait_seconds: float = float(os.getenv("CACHE_LOCK_WAIT_SECONDS", "2"))
+    cache_codec: str = os.getenv("CACHE_CODEC", "orjson")
+    cache_compression: str = os.getenv("CACHE_COMPRESSION", "zlib")
+    cache_compression_min_bytes: int = int(os.getenv("CACHE_COMPRESSION_MIN_BYTES", "1024"))
+    cache_tag_ttl_seconds: int = int(os.getenv("CACHE_TAG_TTL_SECONDS", "86400"))
+    cache_warmup_enabled: bool = os.getenv("CACHE_WARMUP_ENABLED", "true").lower() == "true"
+    cache_warmup_excursions: int = int(os.getenv("CACHE_WARMUP_EXCURSIONS", "100"))
+    cache_invalidation_channel: str = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
     feature_flags: Dict[str, bool] = None
     environment: str = os.getenv("ENVIRONMENT", "dev")
 
     def __post_init__(self):
         self.feature_flags = self._parse_feature_flags(os.getenv("FEATURE_FLAGS"))
+        self.database_replica_urls = [
+            url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+        ]
 
     @staticmethod
     def _parse_feature_flags(raw_flags: str | None) -> Dict[str, bool]:
@@ -79,7 +129,13 @@ class Settings:
             raise ValueError(f"ENVIRONMENT must be one of {', '.join(sorted(allowed))}")
         return value
 
-    @validator("access_token_expire_minutes", "reminder_hours", "cache_ttl_seconds")
+    @validator(
+        "access_token_expire_minutes",
+        "reminder_hours",
+        "cache_ttl_seconds",
+        "cache_local_ttl_seconds",
+        "db_pool_size",
+    )
     def validate_positive_int(cls, value: int, field):  # noqa: N805
         if value <= 0:
             raise ValueError(f"{field.name} must be greater than zero")
@@ -4,6 +4,7 @@ from typing import Any
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import OperationalError
 
 from app.core.errors import ErrorCode
 
@@ -16,6 +17,7 @@ STATUS_TO_ERROR_CODE: dict[int, ErrorCode] = {
     status.HTTP_404_NOT_FOUND: ErrorCode.not_found,
     status.HTTP_409_CONFLICT: ErrorCode.conflict,
     status.HTTP_422_UNPROCESSABLE_ENTITY: ErrorCode.validation_error,
+    status.HTTP_503_SERVICE_UNAVAILABLE: ErrorCode.service_unavailable,
 }
 
 
@@ -26,7 +28,9 @@ def _error_response(
     status_code: int,
     details: Any | None = None,
 ) -> JSONResponse:
-    return JSONResponse(status_code=status_code, content={"code": code, "message": message, "details": details})
+    return JSONResponse(
+        status_code=status_code, content={"code": code, "message": message, "details": details}
+    )
 
 
 def _map_status_to_code(status_code: int) -> ErrorCode:
@@ -39,7 +43,9 @@ def _map_status_to_code(status_code: int) -> ErrorCode:
     return ErrorCode.bad_request
 
 
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:  # noqa: ARG001
+async def http_exception_handler(
+    request: Request, exc: HTTPException  # noqa: ARG001
+) -> JSONResponse:
     message = exc.detail if isinstance(exc.detail, str) else str(exc.detail)
     error_code = _map_status_to_code(exc.status_code)
     return _error_response(code=error_code, message=message, status_code=exc.status_code)
@@ -56,7 +62,9 @@ async def validation_exception_handler(
     )
 
 
-async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:  # noqa: ARG001,B902
+async def unhandled_exception_handler(
+    request: Request, exc: Exception  # noqa: ARG001,B902
+) -> JSONResponse:
     logger.exception("Unhandled exception", exc_info=exc)
     return _error_response(
         code=ErrorCode.internal_error,
@@ -65,7 +73,22 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
     )
 
 
+async def database_error_handler(request: Request, exc: OperationalError) -> JSONResponse:
+    # SQLite gave up waiting for the write lock (busy_timeout): the request can be retried.
+    if "database is locked" not in str(exc.orig):
+        return await unhandled_exception_handler(request, exc)
+    logger.warning("Database is locked", extra={"path": request.url.path})
+    response = _error_response(
+        code=ErrorCode.service_unavailable,
+        message="Database is busy, please retry",
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response.headers["Retry-After"] = "1"
+    return response
+
+
 def setup_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(HTTPException, http_exception_handler)
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(OperationalError, database_error_handler)
     app.add_exception_handler(Exception, unhandled_exception_handler)
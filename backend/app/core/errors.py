@@ -12,6 +12,7 @@ class ErrorCode(str, Enum):
     conflict = "conflict"
     validation_error = "validation_error"
     internal_error = "internal_error"
+    service_unavailable = "service_unavailable"
 
 
 class ErrorResponse(BaseModel):
@@ -1,10 +1,146 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import get_settings
+from app.db_pool import engine_options, instrument_pool
+from app.db_routing import ReplicaSet, RoutingSession
+
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def to_async_url(database_url: str) -> str:
+    """Swap the sync DBAPI in ``database_url`` for its asyncio counterpart."""
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(
+            f"No async driver configured for {url.get_backend_name()!r}; set ASYNC_DATABASE_URL"
+        )
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+def is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def sqlite_pragmas(query_only: bool = False) -> dict:
+    """Per-connection settings of the SQLite profile.
+
+    WAL lets readers run while a write is in progress, and ``synchronous=NORMAL`` is safe in WAL
+    mode (only the last commits can be lost on power failure, never integrity). ``busy_timeout``
+    makes a connection wait for the write lock instead of failing with "database is locked".
+    Reader connections are ``query_only`` so a stray write can never take the lock from them.
+    """
+    settings = get_settings()
+    pragmas = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size_bytes,
+        "cache_size": -settings.sqlite_cache_size_kib,
+    }
+    if query_only:
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine, query_only: bool = False) -> None:
+    pragmas = sqlite_pragmas(query_only)
+
+    @event.listens_for(getattr(engine, "sync_engine", engine), "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def sqlite_engine_options(
+    database_url: str, label: str, writer: bool, is_async: bool = False
+) -> dict:
+    """``engine_options`` for one SQLite file: a single writer connection or a reader pool.
+
+    SQLite serialises writers anyway; queueing them on a one-connection pool keeps the wait in
+    the pool (visible in ``db_pool_checkout_seconds``) rather than in lock retries.
+    """
+    options = engine_options(database_url, label, is_async)
+    if writer:
+        options.update(pool_size=1, max_overflow=0)
+    else:
+        options.update(pool_size=get_settings().sqlite_reader_pool_size)
+    return options
+
+
+def create_sqlite_engine(database_url: str, label: str, writer: bool, is_async: bool = False):
+    options = sqlite_engine_options(database_url, label, writer, is_async)
+    if is_async:
+        sqlite_engine = create_async_engine(to_async_url(database_url), **options)
+    else:
+        sqlite_engine = create_engine(database_url, future=True, **options)
+    apply_sqlite_pragmas(sqlite_engine, query_only=not writer)
+    return sqlite_engine
+
 
 settings = get_settings()
-engine = create_engine(settings.database_url, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+# A SQLite file gets one writer engine plus a pool of readers on the same file, wired up as a
+# replica so RoutingSession sends safe requests to the readers.
+sqlite_profile = (
+    settings.sqlite_profile_enabled
+    and is_sqlite_file(settings.database_url)
+    and not settings.database_replica_urls
+)
+if sqlite_profile:
+    engine = create_sqlite_engine(settings.database_url, "primary", writer=True)
+    replica_engines = [create_sqlite_engine(settings.database_url, "reader", writer=False)]
+else:
+    engine = create_engine(
+        settings.database_url, future=True, **engine_options(settings.database_url, "primary")
+    )
+    replica_engines = [
+        create_engine(url, future=True, **engine_options(url, f"replica-{index}"))
+        for index, url in enumerate(settings.database_replica_urls)
+    ]
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    replicas=ReplicaSet(replica_engines),
+    future=True,
+)
+async_database_url = settings.async_database_url or to_async_url(settings.database_url)
+if sqlite_profile and not settings.async_database_url:
+    async_engine = create_sqlite_engine(
+        settings.database_url, "async-primary", writer=True, is_async=True
+    )
+    async_replica_engines = [
+        create_sqlite_engine(settings.database_url, "async-reader", writer=False, is_async=True)
+    ]
+else:
+    async_engine = create_async_engine(
+        async_database_url, **engine_options(async_database_url, "async-primary", is_async=True)
+    )
+    async_replica_engines = [
+        create_async_engine(
+            to_async_url(url), **engine_options(url, f"async-replica-{index}", is_async=True)
+        )
+        for index, url in enumerate(settings.database_replica_urls)
+    ]
+for pooled_engine in (engine, *replica_engines, async_engine, *async_replica_engines):
+    instrument_pool(pooled_engine)
+# Objects stay usable after commit: lazy refreshes are not possible outside a greenlet.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=ReplicaSet([replica.sync_engine for replica in async_replica_engines]),
+    autoflush=False,
+    expire_on_commit=False,
+)
 Base = declarative_base()
 
 
@@ -14,3 +150,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
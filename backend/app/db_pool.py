@@ -0,0 +1,80 @@
+"""Connection pool settings and Prometheus metrics for every engine in ``app.db``.
+
+Pools are labelled through ``pool_logging_name`` (``primary``, ``replica-0``, ``async-primary``
+...), which SQLAlchemy keeps when it recreates a pool. Checkout latency is measured around
+``QueuePool._do_get`` because the public ``checkout`` event only fires once a connection has
+already been handed out, so it cannot see the time spent waiting on an exhausted pool.
+"""
+
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import get_settings
+
+pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+pool_checkout_timeouts_total = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after pool_timeout", ["pool"]
+)
+pool_size = Gauge("db_pool_size", "Configured number of persistent connections", ["pool"])
+pool_checked_out = Gauge("db_pool_checked_out", "Connections currently checked out", ["pool"])
+pool_overflow = Gauge("db_pool_overflow", "Connections open beyond pool_size", ["pool"])
+
+
+class _CheckoutTimer:
+    def _do_get(self):
+        label = self._orig_logging_name or "default"
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_checkout_timeouts_total.labels(pool=label).inc()
+            raise
+        finally:
+            pool_checkout_seconds.labels(pool=label).observe(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(database_url: str, label: str, is_async: bool = False) -> dict:
+    """Keyword arguments for ``create_engine`` / ``create_async_engine`` from ``Settings``."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; there is no pool to size.
+        return {}
+    settings = get_settings()
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        "pool_logging_name": label,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def instrument_pool(engine: Engine | AsyncEngine) -> None:
+    """Export size, checked-out and overflow gauges; read lazily so ``dispose()`` is safe."""
+    engine = getattr(engine, "sync_engine", engine)
+    if not isinstance(engine.pool, QueuePool):
+        return
+    label = engine.pool._orig_logging_name or "default"
+    pool_size.labels(pool=label).set_function(lambda: engine.pool.size())
+    pool_checked_out.labels(pool=label).set_function(lambda: engine.pool.checkedout())
+    pool_overflow.labels(pool=label).set_function(lambda: max(engine.pool.overflow(), 0))
@@ -0,0 +1,121 @@
+"""Route reads to replicas and writes to the primary.
+
+``RoutingSession`` picks the bind per statement: flushes and sessions that already wrote use the
+primary; sessions created with ``info={"read_only": True}`` and sessions opened while serving a
+safe (GET/HEAD/OPTIONS) request use the replicas in round-robin. After a request writes, the
+client gets a short-lived cookie that pins its following requests to the primary, so users
+always read their own writes regardless of replication lag or which worker serves them.
+"""
+
+import itertools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from http.cookies import SimpleCookie
+from typing import Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+PIN_COOKIE = "db_primary_until"
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+@dataclass
+class RequestRouting:
+    read_only: bool
+    wrote: bool = False
+
+
+_request_routing: ContextVar[RequestRouting | None] = ContextVar("request_routing", default=None)
+
+
+class ReplicaSet:
+    """Round-robin over replica engines; ``next()`` on ``itertools.count`` is thread-safe."""
+
+    def __init__(self, engines: Sequence[Engine]) -> None:
+        self.engines = list(engines)
+        self._counter = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def next(self) -> Engine:
+        return self.engines[next(self._counter) % len(self.engines)]
+
+
+class RoutingSession(Session):
+    def __init__(self, *args, replicas: ReplicaSet | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas or ReplicaSet([])
+
+    def _reads_from_replica(self) -> bool:
+        if not self.replicas or self._flushing or self.info.get("wrote"):
+            return False
+        read_only = self.info.get("read_only")
+        if read_only is not None:
+            return read_only
+        routing = _request_routing.get()
+        return routing is not None and routing.read_only
+
+    def get_bind(self, mapper=None, **kwargs):
+        if self._reads_from_replica():
+            return self.replicas.next()
+        return super().get_bind(mapper, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _remember_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+    routing = _request_routing.get()
+    if routing is not None:
+        routing.wrote = True
+
+
+def _pinned_to_primary(headers: list[tuple[bytes, bytes]]) -> bool:
+    for name, value in headers:
+        if name != b"cookie":
+            continue
+        morsel = SimpleCookie(value.decode("latin-1")).get(PIN_COOKIE)
+        if morsel is None:
+            continue
+        try:
+            return float(morsel.value) > time.time()
+        except ValueError:
+            return False
+    return False
+
+
+class DatabaseRoutingMiddleware:
+    """Marks safe requests read-only and pins writers to the primary for ``sticky_seconds``."""
+
+    def __init__(self, app, sticky_seconds: int) -> None:
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        routing = RequestRouting(
+            read_only=scope["method"] in READ_ONLY_METHODS
+            and not _pinned_to_primary(scope["headers"])
+        )
+        token = _request_routing.set(routing)
+
+        async def send_with_pin(message) -> None:
+            if message["type"] == "http.response.start" and routing.wrote:
+                pin_until = time.time() + self.sticky_seconds
+                cookie = (
+                    f"{PIN_COOKIE}={pin_until:.0f}; Max-Age={self.sticky_seconds}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            _request_routing.reset(token)
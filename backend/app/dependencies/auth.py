@@ -1,38 +1,101 @@
 from fastapi import Depends, Header, HTTPException, status
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models
 from app.core.config import get_settings
-from app.db import get_db
+from app.db import get_async_db, get_db
+from app.services.user_cache import AuthUser, aget_auth_user, get_auth_user
 
 settings = get_settings()
 
 
-def get_current_user(
-    db: Session = Depends(get_db), authorization: str | None = Header(default=None)
-) -> models.User:
+def _token_claims(authorization: str | None) -> dict:
+    """Verified claims of the bearer token; ``sub`` becomes the user id, ``role`` a ``UserRole``."""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
     token = authorization.split(" ", 1)[1]
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id = int(payload.get("sub"))
+        if payload.get("typ") == "refresh":
+            raise JWTError("Refresh tokens are not accepted as access tokens")
+        if "role" in payload:
+            payload["role"] = models.UserRole(payload["role"])
+        return {**payload, "sub": int(payload.get("sub"))}
     except (JWTError, ValueError, TypeError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.get(models.User, user_id)
+
+def _authorize(user: AuthUser | None, claims: dict) -> AuthUser:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    # Tokens issued before token versions existed carry no "ver": they belong to version 0
+    # and stop working with the user's first password or role change.
+    if claims.get("ver", 0) != user.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return user
+
+
+def get_current_user(
+    db: Session = Depends(get_db), authorization: str | None = Header(default=None)
+) -> AuthUser:
+    claims = _token_claims(authorization)
+    return _authorize(get_auth_user(db, claims["sub"]), claims)
+
+
+async def get_async_current_user(
+    db: AsyncSession = Depends(get_async_db), authorization: str | None = Header(default=None)
+) -> AuthUser:
+    claims = _token_claims(authorization)
+    return _authorize(await aget_auth_user(db, claims["sub"]), claims)
+
 
+def _check_role(role: models.UserRole, roles: tuple[models.UserRole, ...]) -> None:
+    if role not in roles:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+def _check_claimed_role(claims: dict, roles: tuple[models.UserRole, ...]) -> None:
+    """Reject a token whose ``role`` claim is not allowed before the user is looked up.
+
+    Changing a role bumps the token version, so a token that passes ``_authorize`` still
+    carries the user's current role and the claim alone decides. Older tokens without the
+    claim are checked against the user's role instead.
+    """
+    if "role" in claims:
+        _check_role(claims["role"], roles)
+
+
+def _authorize_roles(
+    user: AuthUser | None, claims: dict, roles: tuple[models.UserRole, ...]
+) -> AuthUser:
+    user = _authorize(user, claims)
+    if "role" not in claims:
+        _check_role(user.role, roles)
     return user
 
 
 def require_roles(*roles: models.UserRole):
-    def checker(current_user: models.User = Depends(get_current_user)) -> models.User:
-        if current_user.role not in roles:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-        return current_user
+    def checker(
+        db: Session = Depends(get_db), authorization: str | None = Header(default=None)
+    ) -> AuthUser:
+        claims = _token_claims(authorization)
+        _check_claimed_role(claims, roles)
+        return _authorize_roles(get_auth_user(db, claims["sub"]), claims, roles)
+
+    return checker
+
+
+def require_roles_async(*roles: models.UserRole):
+    """``require_roles`` for async routes: the user is loaded without leaving the event loop."""
+
+    async def checker(
+        db: AsyncSession = Depends(get_async_db), authorization: str | None = Header(default=None)
+    ) -> AuthUser:
+        claims = _token_claims(authorization)
+        _check_claimed_role(claims, roles)
+        return _authorize_roles(await aget_auth_user(db, claims["sub"]), claims, roles)
 
     return checker
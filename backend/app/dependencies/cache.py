@@ -0,0 +1,120 @@
+import hashlib
+import inspect
+from functools import wraps
+from typing import Any, Callable, Iterable
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+from app.cache import aget_or_set_cached_response, get_or_set_cached_response
+from app.services.user_cache import AuthUser
+
+_REQUEST_PARAM = "_cache_request"
+
+
+def endpoint_cache_key(name: str, path: str, role: str = "*", query: str = "") -> str:
+    key = f"route:{name}:{role}:{path}"
+    return f"{key}?{query}" if query else key
+
+
+def render_cache_entry(body: str | bytes) -> dict[str, str]:
+    """Cache entry for a rendered JSON body, stored together with its strong ETag."""
+    if isinstance(body, str):
+        body = body.encode()
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    return {"etag": etag, "body": body.decode()}
+
+
+def _etag_matches(etag: str, if_none_match: str | None) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _caller_role(values: Iterable[Any]) -> str:
+    for value in values:
+        if isinstance(value, AuthUser):
+            return value.role.value
+    return "anonymous"
+
+
+def _respond(entry: dict[str, str], request: Request) -> Response:
+    headers = {"ETag": entry["etag"], "Cache-Control": "private, no-cache"}
+    if _etag_matches(entry["etag"], request.headers.get("if-none-match")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(entry["body"], media_type="application/json", headers=headers)
+
+
+def cached_endpoint(
+    name: str,
+    response_model: Any,
+    ttl_seconds: int | None = None,
+    tags: Iterable[str] = (),
+    vary_by_role: bool = True,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Serve a sync or async route from the response cache.
+
+    The key is built from ``name``, the caller's role (unless ``vary_by_role`` is off because
+    every allowed role sees the same data) and the request path with its sorted query string.
+    ``tags`` may reference route parameters, e.g. ``"excursion:{excursion_id}"``. The route
+    result is rendered to JSON with ``response_model`` once, on a miss, and cached with its
+    ETag: hits are sent as-is and a matching ``If-None-Match`` gets ``304 Not Modified``.
+    Hits, misses and rebuild time are recorded under ``name``.
+    """
+    adapter = TypeAdapter(response_model)
+
+    def cache_key(request: Request, kwargs: dict[str, Any]) -> str:
+        role = _caller_role(kwargs.values()) if vary_by_role else "*"
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return endpoint_cache_key(name, request.url.path, role, query)
+
+    def render(result: Any) -> dict[str, str]:
+        validated = adapter.validate_python(result, from_attributes=True)
+        return render_cache_entry(adapter.dump_json(validated))
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(func)
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                request: Request = kwargs.pop(_REQUEST_PARAM)
+
+                async def build() -> dict[str, str]:
+                    return render(await func(*args, **kwargs))
+
+                entry = await aget_or_set_cached_response(
+                    cache_key(request, kwargs),
+                    name,
+                    build,
+                    ttl_seconds,
+                    tags=[tag.format(**kwargs) for tag in tags],
+                )
+                return _respond(entry, request)
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                request: Request = kwargs.pop(_REQUEST_PARAM)
+                entry = get_or_set_cached_response(
+                    cache_key(request, kwargs),
+                    name,
+                    lambda: render(func(*args, **kwargs)),
+                    ttl_seconds,
+                    tags=[tag.format(**kwargs) for tag in tags],
+                )
+                return _respond(entry, request)
+
+        request_param = inspect.Parameter(
+            _REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+        )
+        wrapper.__signature__ = signature.replace(
+            parameters=[*signature.parameters.values(), request_param]
+        )
+        return wrapper
+
+    return decorator
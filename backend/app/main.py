@@ -1,19 +1,61 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.cache_warmup import warm_cache
 from app.core.config import get_settings
 from app.core.error_handlers import setup_exception_handlers
 from app.observability import setup_logging, setup_metrics, setup_tracing
-from app.db import Base, SessionLocal, engine
+from app.db import SessionLocal
+from app.db_routing import DatabaseRoutingMiddleware
+from app.query_stats import QueryStatsMiddleware
+from app.slow_queries import setup_slow_query_log
 from app.routes import admin, auth, feature_flags, feedback, newsletter, parent, teacher
-from app.services.auth import ensure_default_roles
-from app.services.feature_flags import ensure_feature_flags
-
-Base.metadata.create_all(bind=engine)
+from app.seeding import prepare_database
+from app.services.hashing import shutdown_executor
+from app.token_purge import run_purge_loop
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 setup_logging(settings.log_level)
+
+
+def warm_cache_on_startup() -> None:
+    if not settings.cache_warmup_enabled:
+        return
+    try:
+        with SessionLocal(info={"read_only": True}) as db:
+            warm_cache(db)
+    except Exception:  # a cold cache must never block startup
+        logger.exception("Cache warm-up failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing touches the database at import time; workers prepare it when they start serving.
+    await run_in_threadpool(prepare_database)
+    await run_in_threadpool(warm_cache_on_startup)
+    purge_task = None
+    if settings.refresh_token_purge_interval_seconds > 0:
+        purge_task = asyncio.create_task(
+            run_purge_loop(settings.refresh_token_purge_interval_seconds)
+        )
+    yield
+    if purge_task is not None:
+        purge_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await purge_task
+    await run_in_threadpool(shutdown_executor)
+    if tracer_provider:
+        tracer_provider.shutdown()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Excursion Consent API",
     docs_url="/docs" if settings.environment == "dev" else None,
     redoc_url=None,
@@ -22,11 +64,12 @@ app = FastAPI(
 setup_metrics(app)
 tracer_provider = setup_tracing(app, settings)
 setup_exception_handlers(app)
+setup_slow_query_log(settings)
 
-with SessionLocal() as db:
-    ensure_default_roles(db)
-    ensure_feature_flags(db, settings.feature_flags)
-
+app.add_middleware(QueryStatsMiddleware, repeat_threshold=settings.sql_repeat_threshold)
+app.add_middleware(
+    DatabaseRoutingMiddleware, sticky_seconds=settings.database_replica_sticky_seconds
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -47,9 +90,3 @@ app.include_router(feature_flags.router)
 @app.get("/health")
 def health():
     return {"status": "ok"}
-
-
-@app.on_event("shutdown")
-def shutdown_tracing() -> None:
-    if tracer_provider:
-        tracer_provider.shutdown()
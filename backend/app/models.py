@@ -1,7 +1,20 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, JSON, String, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from app.db import Base
@@ -34,6 +47,8 @@ class User(Base):
     email = Column(String, unique=True, nullable=False)
     password_hash = Column(String, nullable=False)
     role_id = Column(Integer, ForeignKey("roles.id"), nullable=False)
+    # Embedded in access tokens; bumped on password or role change to invalidate them.
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
 
     role = relationship("Role", back_populates="users")
@@ -47,8 +62,8 @@ class Student(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    student_class = Column(String, nullable=False)
-    parent_email = Column(String, nullable=True)
+    student_class = Column(String, nullable=False, index=True)
+    parent_email = Column(String, nullable=True, index=True)
     parent_phone = Column(String, nullable=True)
     active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -56,10 +71,16 @@ class Student(Base):
 
 class Excursion(Base):
     __tablename__ = "excursions"
+    __table_args__ = (
+        Index("ix_excursions_created_at_id", "created_at", "id"),
+        Index("ix_excursions_student_class_created_at_id", "student_class", "created_at", "id"),
+        Index("ix_excursions_date_id", "date", "id"),
+        Index("ix_excursions_student_class_date_id", "student_class", "date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_class = Column(String, nullable=False)
-    date = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
     location = Column(String, nullable=False)
     price = Column(Integer, nullable=True)
     description = Column(Text, nullable=True)
@@ -71,6 +92,7 @@ class Excursion(Base):
 
 class Signature(Base):
     __tablename__ = "signatures"
+    __table_args__ = (Index("ix_signatures_excursion_id_student_id", "excursion_id", "student_id"),)
 
     id = Column(Integer, primary_key=True)
     excursion_id = Column(Integer, ForeignKey("excursions.id"), nullable=False)
@@ -120,11 +142,23 @@ class NewsletterSubscription(Base):
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Only revoked rows, so the purge finds them without scanning live tokens.
+        Index(
+            "ix_refresh_tokens_revoked_id",
+            "id",
+            sqlite_where=text("revoked = 1"),
+            postgresql_where=text("revoked"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String, unique=True, index=True, nullable=False)
+    # sha256 hex digest; the token itself is only ever known to the client.
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    # Shared by every rotation of one sign-in; tokens from before families existed have none.
+    family_id = Column(String(32), nullable=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     revoked = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -0,0 +1,129 @@
+"""Create parent accounts for every ``Student.parent_email`` that has none yet.
+
+Each new parent gets a random initial password that is reported once, in the ``created``
+events, for distribution to families. Hashes are computed on every core while progress is
+reported; the accounts are then written with a single bulk ``INSERT`` that skips emails taken
+in the meantime, so the job is idempotent and safe to run again or concurrently.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import secrets
+import sys
+import time
+from contextlib import closing
+from typing import Iterator
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+from app.services.auth import ensure_role
+from app.services.hashing import hash_many
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_EVERY = 200
+
+
+def missing_parent_emails(db: Session) -> list[str]:
+    """Distinct roster emails, lower-cased, that no user has registered (in any case)."""
+    roster = func.lower(func.trim(models.Student.parent_email))
+    existing = select(func.lower(models.User.email))
+    return list(
+        db.scalars(
+            select(roster)
+            .where(models.Student.parent_email.is_not(None), roster != "")
+            .where(roster.not_in(existing))
+            .distinct()
+            .order_by(roster)
+        )
+    )
+
+
+def _insert_new_users(db: Session):
+    """``INSERT`` that ignores emails registered concurrently and returns the ones it wrote."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(models.User).returning(models.User.email)
+    return (
+        dialect_insert(models.User)
+        .on_conflict_do_nothing(index_elements=[models.User.email])
+        .returning(models.User.email)
+    )
+
+
+def provision_parents(db: Session, workers: int | None = None) -> Iterator[dict]:
+    """Run the provisioning, yielding progress events as plain dicts.
+
+    Events: ``start`` (how many accounts are missing), ``hashed`` every ``PROGRESS_EVERY``
+    passwords, one ``created`` per new account with its initial password, and ``done``.
+    """
+    started = time.perf_counter()
+    emails = missing_parent_emails(db)
+    yield {"event": "start", "missing": len(emails)}
+    if not emails:
+        yield {"event": "done", "created": 0, "skipped": 0, "seconds": 0.0}
+        return
+
+    role_id = ensure_role(db, models.UserRole.parent).id
+    # Hashing takes a while: give the connection back instead of holding it idle in a
+    # transaction; the insert below opens a fresh one.
+    db.commit()
+    passwords = [secrets.token_urlsafe(9) for _ in emails]
+    rows = []
+    # Closed with this generator, so a consumer that stops early cancels the queued hashes.
+    with closing(hash_many(passwords, workers)) as hashes:
+        for index, (email, password_hash) in enumerate(zip(emails, hashes), start=1):
+            rows.append({"email": email, "password_hash": password_hash, "role_id": role_id})
+            if index % PROGRESS_EVERY == 0 or index == len(emails):
+                yield {"event": "hashed", "done": index, "total": len(emails)}
+
+    created = set(db.scalars(_insert_new_users(db), rows))
+    db.commit()
+    for email, password in zip(emails, passwords):
+        if email in created:
+            yield {"event": "created", "email": email, "password": password}
+
+    summary = {
+        "created": len(created),
+        "skipped": len(emails) - len(created),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    # "created" is a reserved LogRecord attribute, hence the prefix.
+    logger.info(
+        "Parent accounts provisioned",
+        extra={f"provisioning_{key}": value for key, value in summary.items()},
+    )
+    yield {"event": "done", **summary}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--output", required=True, help="CSV file for the new accounts (email,password)"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (all cores)")
+    args = parser.parse_args()
+
+    with SessionLocal() as db, open(args.output, "w", newline="") as output:
+        writer = csv.writer(output)
+        writer.writerow(["email", "password"])
+        for event in provision_parents(db, args.workers):
+            if event["event"] == "created":
+                writer.writerow([event["email"], event["password"]])
+            else:
+                print(json.dumps(event), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Per-request SQL statistics: query count, DB time and repeated statements.
+
+Cursor events on every ``Engine`` feed the ``RequestQueryStats`` of the request being served,
+which ``QueryStatsMiddleware`` installs in a context variable. At the end of the request the
+totals go to Prometheus (labelled by route template) and to a ``Server-Timing`` header. A
+statement executed more than ``SQL_REPEAT_THRESHOLD`` times in one request is usually an N+1
+lazy load: it is logged, and under pytest it raises so the test that triggers it fails.
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+request_db_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+class RepeatedQueryError(AssertionError):
+    """Raised under pytest when a request repeats one statement past the threshold."""
+
+
+@dataclass
+class RequestQueryStats:
+    repeat_threshold: int
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+        if self.statements[statement] != self.repeat_threshold + 1:
+            return
+        message = (
+            f"SQL statement repeated more than {self.repeat_threshold} times in one request "
+            f"(likely N+1): {statement[:200]}"
+        )
+        if os.environ.get("PYTEST_CURRENT_TEST"):
+            raise RepeatedQueryError(message)
+        logger.warning(message)
+
+
+_request_stats: ContextVar[RequestQueryStats | None] = ContextVar("request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_timer(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app, repeat_threshold: int) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(self.repeat_threshold)
+        token = _request_stats.set(stats)
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                timing = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", timing.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            route = scope.get("route")
+            labels = {
+                "method": scope["method"],
+                "route": getattr(route, "path", "unmatched"),
+            }
+            request_db_queries.labels(**labels).observe(stats.count)
+            request_db_seconds.labels(**labels).observe(stats.duration)
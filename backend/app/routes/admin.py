@@ -1,20 +1,23 @@
 import io
-import pandas as pd
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from sqlalchemy.orm import Session
+import json
+import logging
+from contextlib import closing
+from typing import Iterator
 
-from app import models, schemas
-import io
-
-import pandas as pd
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app import models, schemas
-from app.db import get_db
-from app.utils import get_password_hash
+from app.db import SessionLocal, get_db
+from app.provisioning import provision_parents
+from app.services.hashing import hash_password
 from app.services import auth as auth_service
 from app.dependencies.auth import require_roles
+from app.services.user_cache import AuthUser
+from app.slow_queries import slow_query_log
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -23,7 +26,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 def create_user(payload: schemas.UserCreate, db: Session = Depends(get_db)):
     role = auth_service.ensure_role(db, payload.role)
     user = models.User(
-        email=payload.email, password_hash=get_password_hash(payload.password), role=role
+        email=payload.email, password_hash=hash_password(payload.password), role=role
     )
     db.add(user)
     db.commit()
@@ -35,8 +38,11 @@ def create_user(payload: schemas.UserCreate, db: Session = Depends(get_db)):
 def import_students(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_roles(models.UserRole.admin)),
+    current_user: AuthUser = Depends(require_roles(models.UserRole.admin)),
 ):
+    # pandas (and openpyxl behind read_excel) costs ~0.3s to import; load it on first upload.
+    import pandas as pd
+
     try:
         content = file.file.read()
         df = (
@@ -61,3 +67,43 @@ def import_students(
     for st in students:
         db.refresh(st)
     return students
+
+
+def _provision_stream() -> Iterator[str]:
+    # The request's session is closed before the body streams, so the job opens its own;
+    # closing the stream early (client gone) closes the job and drops its queued hashes.
+    with SessionLocal() as db, closing(provision_parents(db)) as events:
+        for event in events:
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+
+@router.post("/parents/provision")
+def provision_parent_accounts(
+    reveal_passwords: bool = Query(
+        False, description="Confirm that initial passwords are streamed in plain text"
+    ),
+    current_user: AuthUser = Depends(require_roles(models.UserRole.admin)),
+):
+    """Create missing parent accounts from the student roster, streaming NDJSON progress."""
+    if not reveal_passwords:
+        raise HTTPException(
+            status_code=400,
+            detail="Initial passwords are sent in plain text; repeat with reveal_passwords=true",
+        )
+    logger.warning(
+        "Parent accounts provisioned with initial passwords in the response",
+        extra={"user_id": current_user.id},
+    )
+    return StreamingResponse(
+        _provision_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@router.get("/slow-queries", response_model=list[schemas.SlowQueryOut])
+def list_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: AuthUser = Depends(require_roles(models.UserRole.admin)),
+):
+    return slow_query_log.top(limit)
@@ -1,25 +1,17 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import schemas
-from app.cache import get_cached_response, set_cached_response
-from app.db import get_db
-from app.services.feature_flags import list_feature_flags
+from app.db import get_async_db
+from app.dependencies.cache import cached_endpoint
+from app.services.feature_flags import list_feature_flags_async
 
 router = APIRouter(prefix="/feature-flags", tags=["feature-flags"])
 
 
 @router.get("", response_model=list[schemas.FeatureFlagOut])
-def get_feature_flags(db: Session = Depends(get_db)):
-    cache_key = "feature_flags:all"
-    cached = get_cached_response(cache_key, endpoint="feature_flags")
-    if cached is not None:
-        return cached
-
-    flags = list_feature_flags(db)
-    serialized = [
-        schemas.FeatureFlagOut.model_validate(flag, from_attributes=True).model_dump()
-        for flag in flags
-    ]
-    set_cached_response(cache_key, serialized)
-    return serialized
+@cached_endpoint(
+    "feature_flags", response_model=list[schemas.FeatureFlagOut], tags=["feature_flags"]
+)
+async def get_feature_flags(db: AsyncSession = Depends(get_async_db)):
+    return await list_feature_flags_async(db)
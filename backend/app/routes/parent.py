@@ -1,28 +1,39 @@
 import base64
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models, schemas
-from app.db import get_db
+from app.db import get_async_db, get_db
 from app.services.pdf import render_pdf_template
 from app.services.storage import save_pdf
-from app.dependencies.auth import require_roles
+from app.cache import invalidate_tags
+from app.dependencies.auth import require_roles, require_roles_async
+from app.services.user_cache import AuthUser
+from app.dependencies.cache import cached_endpoint
 
 router = APIRouter(prefix="/parent", tags=["parent"])
 
 
 @router.get("/signatures/{excursion_id}/{student_id}", response_model=list[schemas.SignatureOut])
-def list_signatures(
+@cached_endpoint(
+    "parent_signatures",
+    response_model=list[schemas.SignatureOut],
+    tags=["signatures:{excursion_id}:{student_id}"],
+)
+async def list_signatures(
     excursion_id: int,
     student_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(
-        require_roles(models.UserRole.parent, models.UserRole.admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(
+        require_roles_async(models.UserRole.parent, models.UserRole.admin)
     ),
 ):
-    return (
-        db.query(models.Signature).filter_by(excursion_id=excursion_id, student_id=student_id).all()
+    signatures = await db.scalars(
+        select(models.Signature).filter_by(excursion_id=excursion_id, student_id=student_id)
     )
+    return signatures.all()
 
 
 @router.post("/sign/{excursion_id}/{student_id}", response_model=schemas.SignatureOut)
@@ -31,9 +42,7 @@ def sign_excursion(
     student_id: int,
     payload: schemas.SignatureIn,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(
-        require_roles(models.UserRole.parent, models.UserRole.admin)
-    ),
+    current_user: AuthUser = Depends(require_roles(models.UserRole.parent, models.UserRole.admin)),
 ):
     excursion = db.get(models.Excursion, excursion_id)
     student = db.get(models.Student, student_id)
@@ -58,4 +67,5 @@ def sign_excursion(
     db.add(signature)
     db.commit()
     db.refresh(signature)
+    invalidate_tags([f"signatures:{excursion.id}:{student.id}"])
     return signature
@@ -1,78 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
-from app.cache import (
-    get_cached_response,
-    invalidate_cache,
-    set_cached_response,
+from app.cache import ainvalidate_tags, aset, aset_many
+from app.db import get_async_db
+from app.dependencies.auth import require_roles_async
+from app.services.user_cache import AuthUser
+from app.dependencies.cache import cached_endpoint, endpoint_cache_key, render_cache_entry
+from app.services.excursions import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    excursion_page,
+    excursion_page_query,
 )
-from app.db import get_db
-from app.dependencies.auth import require_roles
 
 router = APIRouter(prefix="/teacher", tags=["teacher"])
 
 
+def excursion_cache_entry(excursion: models.Excursion) -> tuple[str, dict]:
+    """Key and entry under which ``get_excursion`` caches ``excursion``."""
+    key = endpoint_cache_key(
+        "teacher_excursion_detail", f"{router.prefix}/excursions/{excursion.id}"
+    )
+    payload = schemas.ExcursionOut.model_validate(excursion, from_attributes=True)
+    return key, render_cache_entry(payload.model_dump_json())
+
+
 @router.post("/excursions", response_model=schemas.ExcursionOut)
-def create_excursion(
+async def create_excursion(
     payload: schemas.ExcursionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user_id: int | None = None,
 ):
     creator_id = current_user_id or 1
     excursion = models.Excursion(**payload.dict(), created_by=creator_id)
     db.add(excursion)
-    db.commit()
-    db.refresh(excursion)
-    invalidate_cache(["teacher:excursions"])
-    set_cached_response(
-        f"teacher:excursions:{excursion.id}",
-        schemas.ExcursionOut.model_validate(excursion, from_attributes=True).model_dump(),
-    )
+    await db.commit()
+    await db.refresh(excursion)
+    await ainvalidate_tags(["excursions"])
+    key, entry = excursion_cache_entry(excursion)
+    await aset(key, entry, tags=[f"excursion:{excursion.id}"])
     return excursion
 
 
-@router.get("/excursions", response_model=list[schemas.ExcursionOut])
-def list_excursions(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(
-        require_roles(models.UserRole.teacher, models.UserRole.admin)
+@router.get("/excursions", response_model=schemas.ExcursionPage)
+@cached_endpoint(
+    "teacher_excursions",
+    response_model=schemas.ExcursionPage,
+    tags=["excursions"],
+    vary_by_role=False,
+)
+async def list_excursions(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="`next_cursor` of the previous page"),
+    student_class: str | None = None,
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(
+        require_roles_async(models.UserRole.teacher, models.UserRole.admin)
     ),
 ):
-    cache_key = "teacher:excursions"
-    cached = get_cached_response(cache_key, endpoint="teacher_excursions")
-    if cached is not None:
-        return cached
-
-    excursions = (
-        db.query(models.Excursion).order_by(models.Excursion.created_at.desc()).all()
+    query = excursion_page_query(limit, cursor, student_class, date_from, date_to)
+    page = excursion_page((await db.scalars(query)).all(), limit)
+    excursions = page["items"]
+    details = dict(excursion_cache_entry(excursion) for excursion in excursions)
+    await aset_many(
+        details,
+        tags={key: [f"excursion:{excursion.id}"] for key, excursion in zip(details, excursions)},
     )
-    serialized = [
-        schemas.ExcursionOut.model_validate(excursion, from_attributes=True).model_dump()
-        for excursion in excursions
-    ]
-    set_cached_response(cache_key, serialized)
-    return serialized
+    return page
 
 
 @router.get("/excursions/{excursion_id}", response_model=schemas.ExcursionOut)
-def get_excursion(
+@cached_endpoint(
+    "teacher_excursion_detail",
+    response_model=schemas.ExcursionOut,
+    tags=["excursion:{excursion_id}"],
+    vary_by_role=False,
+)
+async def get_excursion(
     excursion_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(
-        require_roles(models.UserRole.teacher, models.UserRole.admin)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(
+        require_roles_async(models.UserRole.teacher, models.UserRole.admin)
     ),
 ):
-    cache_key = f"teacher:excursions:{excursion_id}"
-    cached = get_cached_response(cache_key, endpoint="teacher_excursion_detail")
-    if cached is not None:
-        return cached
-
-    excursion = db.get(models.Excursion, excursion_id)
+    excursion = await db.get(models.Excursion, excursion_id)
     if not excursion:
         raise HTTPException(status_code=404, detail="Excursion not found")
-    serialized = schemas.ExcursionOut.model_validate(
-        excursion, from_attributes=True
-    ).model_dump()
-    set_cached_response(cache_key, serialized)
-    return serialized
+    return excursion
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+from datetime import date as date_type, datetime
+from typing import Any, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_serializer, field_validator
 from app.models import Role, SignatureMode, UserRole
@@ -110,7 +110,7 @@ class StudentOut(StudentCreate):
 
 class ExcursionCreate(BaseModel):
     student_class: str = Field(..., description="Target class for the excursion")
-    date: str = Field(..., description="Excursion date in ISO format")
+    date: date_type = Field(..., description="Excursion date in ISO format")
     location: str = Field(..., description="Destination name")
     price: Optional[int] = Field(
         default=None, description="Price per student in rubles (if applicable)"
@@ -141,11 +141,16 @@ class ExcursionOut(ExcursionCreate):
         from_attributes = True
 
 
+class ExcursionPage(BaseModel):
+    items: list[ExcursionOut]
+    next_cursor: Optional[str] = Field(
+        default=None, description="Pass as `cursor` to get the next page; null on the last page"
+    )
+
+
 class SignatureIn(BaseModel):
     mode: SignatureMode = Field(..., description="How the signature was captured")
-    strokes: Optional[list] = Field(
-        default=None, description="Raw signature strokes for draw mode"
-    )
+    strokes: Optional[list] = Field(default=None, description="Raw signature strokes for draw mode")
     metadata_json: Optional[dict] = Field(
         default=None, description="Additional metadata provided by the client"
     )
@@ -219,9 +224,7 @@ class NewsletterCreate(BaseModel):
     name: str | None = Field(default=None, min_length=2, max_length=100)
 
     model_config = ConfigDict(
-        json_schema_extra={
-            "example": {"email": "subscriber@example.com", "name": "Пётр"}
-        }
+        json_schema_extra={"example": {"email": "subscriber@example.com", "name": "Пётр"}}
     )
 
 
@@ -240,3 +243,15 @@ class FeatureFlagOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SlowQueryOut(BaseModel):
+    statement: str
+    count: int
+    max_ms: float
+    mean_ms: float
+    last_seen: datetime
+    parameters: Any = Field(default=None, description="Bound parameters redacted to type names")
+    plan: Optional[list[str]] = Field(
+        default=None, description="Latest sampled EXPLAIN output, if any was captured"
+    )
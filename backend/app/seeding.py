@@ -1,17 +1,25 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Iterable
+import logging
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Iterable, Iterator
 
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
 from app import models
 from app.core.config import get_settings
 from app.db import Base, SessionLocal, engine
-from app.services.auth import ensure_role
+from app.services.auth import ensure_default_roles, ensure_role
 from app.services.feature_flags import ensure_feature_flags
 from app.utils import get_password_hash
 
+logger = logging.getLogger(__name__)
+
+# Key of the Postgres advisory lock taken by every worker while it prepares the database.
+STARTUP_LOCK_KEY = 0x6578_6375_7273  # "excurs"
+
 
 def _get_user(db: Session, email: str) -> models.User | None:
     return db.query(models.User).filter(models.User.email == email).one_or_none()
@@ -27,7 +35,11 @@ def seed_users(db: Session) -> None:
     """Create baseline users for demos and manual testing."""
     users = [
         {"email": "admin@example.com", "password": "admin1234", "role": models.UserRole.admin},
-        {"email": "teacher@example.com", "password": "teacher1234", "role": models.UserRole.teacher},
+        {
+            "email": "teacher@example.com",
+            "password": "teacher1234",
+            "role": models.UserRole.teacher,
+        },
         {"email": "parent@example.com", "password": "parent1234", "role": models.UserRole.parent},
     ]
 
@@ -100,14 +112,14 @@ def seed_excursions(db: Session) -> None:
     excursions: Iterable[dict] = [
         {
             "student_class": "5А",
-            "date": (datetime.utcnow() + timedelta(days=7)).strftime("%Y-%m-%d"),
+            "date": date.today() + timedelta(days=7),
             "location": "Планетарий",
             "price": 800,
             "description": "Осмотр экспозиций и мастер-класс по астрономии.",
         },
         {
             "student_class": "6Б",
-            "date": (datetime.utcnow() + timedelta(days=14)).strftime("%Y-%m-%d"),
+            "date": date.today() + timedelta(days=14),
             "location": "Политехнический музей",
             "price": 1200,
             "description": "Интерактивная экскурсия по новым залам.",
@@ -134,6 +146,52 @@ def seed_feature_flags(db: Session) -> None:
     ensure_feature_flags(db, settings.feature_flags)
 
 
+@contextmanager
+def advisory_lock(key: int) -> Iterator[None]:
+    """Hold a database-wide lock for the block so concurrent workers run it one at a time.
+
+    Postgres uses a session-level ``pg_advisory_lock`` on a connection of its own, so commits
+    made inside the block do not release it. Other backends have no advisory locks; on SQLite
+    the file lock already serialises the writes, so the block simply runs.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+            connection.commit()
+
+
+def _startup_seed_done(db: Session) -> bool:
+    roles = set(db.scalars(select(models.Role.name)))
+    flags = dict(db.execute(select(models.FeatureFlag.name, models.FeatureFlag.enabled)).all())
+    defaults = get_settings().feature_flags
+    return roles >= set(models.UserRole) and all(
+        flags.get(name) == enabled for name, enabled in defaults.items()
+    )
+
+
+def prepare_database() -> bool:
+    """Create missing tables and seed roles and feature flags, once per deployment.
+
+    Every worker calls this on startup; the first one to take the lock does the work and the
+    rest find it done. Returns whether this process seeded anything.
+    """
+    with advisory_lock(STARTUP_LOCK_KEY):
+        Base.metadata.create_all(bind=engine)
+        with SessionLocal() as db:
+            if _startup_seed_done(db):
+                return False
+            ensure_default_roles(db)
+            seed_feature_flags(db)
+    logger.info("Seeded default roles and feature flags")
+    return True
+
+
 def seed_all() -> None:
     Base.metadata.create_all(bind=engine)
     with SessionLocal() as db:
@@ -1,13 +1,22 @@
+import hashlib
+import logging
+import time
+import uuid
 from datetime import datetime, timedelta
-from secrets import token_urlsafe
 
 from fastapi import HTTPException
+from jose import ExpiredSignatureError, JWTError
+from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.core.config import get_settings
-from app.utils import create_access_token, get_password_hash, verify_password
+from app.services import token_denylist
+from app.services.hashing import hash_password, verify_password
+from app.services.user_cache import get_auth_user
+from app.utils import create_access_token, create_refresh_token, decode_refresh_token
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
@@ -27,7 +36,7 @@ def create_user(db: Session, payload: schemas.UserCreate) -> models.User:
     role = ensure_role(db, payload.role)
     user = models.User(
         email=payload.email,
-        password_hash=get_password_hash(payload.password),
+        password_hash=hash_password(payload.password),
         role=role,
     )
     db.add(user)
@@ -43,45 +52,161 @@ def authenticate_user(db: Session, email: str, password: str) -> models.User:
     return user
 
 
-def _create_refresh_token(user: models.User) -> models.RefreshToken:
+def hash_refresh_token(token: str) -> str:
+    """Lookup key of a refresh token; the table never stores the token itself."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _add_token_pair(
+    db: Session,
+    user_id: int,
+    role: models.UserRole,
+    token_version: int,
+    family_id: str,
+) -> schemas.TokenPair:
+    """Stage a new access/refresh pair in the current transaction without committing."""
     expires_at = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
-    return models.RefreshToken(
-        token=token_urlsafe(48),
-        user=user,
-        expires_at=expires_at,
+    token = create_refresh_token(str(user_id), family_id, expires_at)
+    db.add(
+        models.RefreshToken(
+            token_hash=hash_refresh_token(token),
+            family_id=family_id,
+            user_id=user_id,
+            expires_at=expires_at,
+        )
     )
+    access_token = create_access_token(str(user_id), role=role.value, token_version=token_version)
+    return schemas.TokenPair(access_token=access_token, refresh_token=token)
 
 
 def issue_tokens(db: Session, user: models.User) -> schemas.TokenPair:
-    access_token = create_access_token(str(user.id))
-    refresh_token = _create_refresh_token(user)
-    db.add(refresh_token)
+    """Start a new token family for a fresh sign-in."""
+    token_pair = _add_token_pair(
+        db, user.id, user.role.name, user.token_version, family_id=uuid.uuid4().hex
+    )
     db.commit()
-    db.refresh(refresh_token)
-    return schemas.TokenPair(access_token=access_token, refresh_token=refresh_token.token)
+    return token_pair
+
+
+def _refresh_claims(token: str, verify_exp: bool = True) -> dict | None:
+    try:
+        return decode_refresh_token(token, verify_exp=verify_exp)
+    except ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Refresh token expired")
+    except JWTError:
+        return None
+
+
+def _revoke_family_rows(db: Session, family_id: str) -> None:
+    db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.family_id == family_id)
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _use_token_row(db: Session, token_hash: str) -> bool:
+    """Mark the token's row revoked; False if it was revoked (or purged) before."""
+    result = db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.token_hash == token_hash, ~models.RefreshToken.revoked)
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def _has_live_tokens(db: Session, family_id: str) -> bool:
+    query = select(models.RefreshToken.id).where(
+        models.RefreshToken.family_id == family_id, ~models.RefreshToken.revoked
+    )
+    return db.scalar(query.limit(1)) is not None
 
 
 def refresh_tokens(db: Session, token: str) -> schemas.TokenPair:
-    stored = db.query(models.RefreshToken).filter(models.RefreshToken.token == token).first()
-    if not stored or stored.revoked:
+    """Rotate ``token``: mark it used and issue the next pair of the same family.
+
+    The signature and the denylist decide whether the token is still good, so
+    ``refresh_tokens`` is only written here. The row is revoked only if it was not already,
+    which is what decides while Redis is unavailable. A rotation that fails before its
+    commit releases the token again, so the client can retry it. A token presented a second
+    time has leaked (or been replayed): its whole family is revoked and every holder has to
+    sign in again.
+    """
+    claims = _refresh_claims(token)
+    if claims is None or token_denylist.is_family_revoked(claims["fam"]):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user = get_auth_user(db, int(claims["sub"]))
+    if user is None:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
-    if stored.expires_at < datetime.utcnow():
-        raise HTTPException(status_code=401, detail="Refresh token expired")
 
-    stored.revoked = True
-    token_pair = issue_tokens(db, stored.user)
+    family_id = claims["fam"]
+    token_hash = hash_refresh_token(token)
+    first_use = token_denylist.use_token(token_hash, claims["exp"] - int(time.time()))
+    try:
+        if first_use is not False and _use_token_row(db, token_hash):
+            token_pair = _add_token_pair(db, user.id, user.role, user.token_version, family_id)
+            db.commit()
+            return token_pair
+    except Exception:
+        # Nothing was issued (e.g. the database stayed locked): the retry is not a reuse.
+        db.rollback()
+        if first_use:
+            token_denylist.release_token(token_hash)
+        raise
+
+    # Without Redis a logged-out family looks the same; only a live family was reused.
+    if first_use is not False and not _has_live_tokens(db, family_id):
+        db.rollback()
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    token_denylist.revoke_family(family_id)
+    token_denylist.refresh_token_reuse.inc()
+    logger.warning(
+        "Refresh token reused, token family revoked",
+        extra={"user_id": claims["sub"], "token_family": family_id},
+    )
+    _revoke_family_rows(db, family_id)
     db.commit()
-    return token_pair
+    raise HTTPException(status_code=401, detail="Invalid refresh token")
 
 
 def revoke_token(db: Session, token: str) -> None:
-    stored = db.query(models.RefreshToken).filter(models.RefreshToken.token == token).first()
-    if not stored:
+    """Log out: revoke the token's family, i.e. every token of that sign-in."""
+    claims = _refresh_claims(token, verify_exp=False)
+    if claims is None:
         raise HTTPException(status_code=404, detail="Refresh token not found")
-    stored.revoked = True
+    token_denylist.revoke_family(claims["fam"])
+    _revoke_family_rows(db, claims["fam"])
     db.commit()
 
 
+def purge_refresh_tokens(db: Session, batch_size: int = 1000, now: datetime | None = None) -> int:
+    """Delete expired and revoked refresh tokens, ``batch_size`` rows per transaction.
+
+    Small batches keep each delete short, so logins writing to the table are never blocked
+    for long. Returns the number of rows deleted.
+    """
+    now = now or datetime.utcnow()
+    # A bare boolean column renders as a literal predicate that matches the partial index.
+    conditions = [models.RefreshToken.expires_at < now, models.RefreshToken.revoked]
+    deleted = 0
+    for condition in conditions:
+        while True:
+            ids = select(models.RefreshToken.id).where(condition).limit(batch_size)
+            result = db.execute(
+                delete(models.RefreshToken)
+                .where(models.RefreshToken.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+    return deleted
+
+
 def ensure_default_roles(db: Session) -> None:
     for role in models.UserRole:
         ensure_role(db, role)
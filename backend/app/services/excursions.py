@@ -0,0 +1,75 @@
+import base64
+import binascii
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import Select, select, tuple_
+
+from app import models
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(excursion: models.Excursion) -> str:
+    """Opaque position of ``excursion``; carries the sort keys of both page orderings."""
+    raw = f"{excursion.created_at.isoformat()}|{excursion.date.isoformat()}|{excursion.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, date, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, excursion_date, excursion_id = raw.split("|")
+        return (
+            datetime.fromisoformat(created_at),
+            date.fromisoformat(excursion_date),
+            int(excursion_id),
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def excursion_page_query(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    student_class: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> Select:
+    """Keyset page of excursions; fetches one extra row to detect whether more follow.
+
+    Without a date range the page is newest-first on ``(created_at, id)``. With ``date_from`` or
+    ``date_to`` it is a chronological range scan on ``(date, id)``. Both the seek predicate and
+    the ordering match an index (``ix_excursions_[student_class_]created_at_id`` or
+    ``ix_excursions_[student_class_]date_id``), so a page costs the same at any depth instead
+    of growing with ``OFFSET``.
+    """
+    query = select(models.Excursion)
+    if student_class:
+        query = query.where(models.Excursion.student_class == student_class)
+    if date_from:
+        query = query.where(models.Excursion.date >= date_from)
+    if date_to:
+        query = query.where(models.Excursion.date <= date_to)
+
+    if date_from or date_to:
+        if cursor:
+            _, excursion_date, excursion_id = decode_cursor(cursor)
+            position = tuple_(models.Excursion.date, models.Excursion.id)
+            query = query.where(position > tuple_(excursion_date, excursion_id))
+        order_by = (models.Excursion.date.asc(), models.Excursion.id.asc())
+    else:
+        if cursor:
+            created_at, _, excursion_id = decode_cursor(cursor)
+            position = tuple_(models.Excursion.created_at, models.Excursion.id)
+            query = query.where(position < tuple_(created_at, excursion_id))
+        order_by = (models.Excursion.created_at.desc(), models.Excursion.id.desc())
+    return query.order_by(*order_by).limit(limit + 1)
+
+
+def excursion_page(rows: list[models.Excursion], limit: int) -> dict:
+    """Envelope for rows fetched with ``excursion_page_query(limit, ...)``."""
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
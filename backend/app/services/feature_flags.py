@@ -1,15 +1,15 @@
 from typing import Dict, Iterable
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models
-from app.cache import invalidate_cache
+from app.cache import invalidate_tags
 
 
 def ensure_feature_flags(db: Session, defaults: Dict[str, bool]) -> None:
-    existing_flags = {
-        flag.name: flag for flag in db.query(models.FeatureFlag).all()
-    }
+    existing_flags = {flag.name: flag for flag in db.query(models.FeatureFlag).all()}
 
     updated_or_new: list[models.FeatureFlag] = []
     for name, enabled in defaults.items():
@@ -27,8 +27,13 @@ def ensure_feature_flags(db: Session, defaults: Dict[str, bool]) -> None:
         for flag in updated_or_new:
             db.refresh(flag)
 
-    invalidate_cache(["feature_flags:all"])
+    invalidate_tags(["feature_flags"])
 
 
 def list_feature_flags(db: Session) -> Iterable[models.FeatureFlag]:
     return db.query(models.FeatureFlag).order_by(models.FeatureFlag.id).all()
+
+
+async def list_feature_flags_async(db: AsyncSession) -> Iterable[models.FeatureFlag]:
+    flags = await db.scalars(select(models.FeatureFlag).order_by(models.FeatureFlag.id))
+    return flags.all()
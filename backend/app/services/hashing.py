@@ -0,0 +1,155 @@
+"""Password hashing off the request thread.
+
+pbkdf2 is CPU-bound and holds the GIL for its whole run, so a burst of logins on a worker
+stalls every other request it serves. Hashes are computed in a ``ProcessPoolExecutor`` of
+``PASSWORD_HASH_WORKERS`` processes instead: sync callers (routes running in the threadpool)
+block on the future without holding the GIL, async callers await it. With
+``PASSWORD_HASH_WORKERS=0`` everything runs inline, as before.
+
+A hashing process that dies (OOM killer, a crashed extension) breaks the whole pool, so a
+call that finds it broken replaces the pool and is retried once on the new one.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from prometheus_client import Gauge, Histogram
+
+from app import utils
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+password_hash_seconds = Histogram(
+    "password_hash_seconds",
+    "Time to hash or verify a password, including the wait for a hashing process",
+    ["operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+password_hash_in_flight = Gauge(
+    "password_hash_in_flight", "Password hashes submitted and not finished yet"
+)
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    if settings.password_hash_workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a worker that already runs threads and an event loop is unsafe.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+@contextmanager
+def _measure(operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    password_hash_in_flight.inc()
+    try:
+        yield
+    finally:
+        password_hash_in_flight.dec()
+        password_hash_seconds.labels(operation=operation).observe(time.perf_counter() - started)
+
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    logger.warning("Password hashing pool broken, starting a new one")
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _call(function, *args):
+    for attempt in range(2):
+        executor = get_executor()
+        if executor is None:
+            return function(*args)
+        try:
+            return executor.submit(function, *args).result()
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            if attempt:
+                raise
+
+
+async def _acall(function, *args):
+    for attempt in range(2):
+        executor = get_executor()
+        if executor is None:
+            return await asyncio.to_thread(function, *args)
+        try:
+            return await asyncio.wrap_future(executor.submit(function, *args))
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            if attempt:
+                raise
+
+
+def hash_password(password: str) -> str:
+    with _measure("hash"):
+        return _call(utils.get_password_hash, password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    with _measure("verify"):
+        return _call(utils.verify_password, plain_password, hashed_password)
+
+
+async def ahash_password(password: str) -> str:
+    with _measure("hash"):
+        return await _acall(utils.get_password_hash, password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    with _measure("verify"):
+        return await _acall(utils.verify_password, plain_password, hashed_password)
+
+
+def hash_many(passwords: Iterable[str], workers: int | None = None) -> Iterator[str]:
+    """Hash a batch on every core, yielding hashes in input order as they complete.
+
+    Uses a pool of its own sized to the machine rather than the per-request pool, so a bulk
+    job does not queue logins behind thousands of hashes.
+    """
+    passwords = list(passwords)
+    workers = min(workers or os.cpu_count() or 1, max(len(passwords), 1))
+    if workers <= 1:
+        yield from map(utils.get_password_hash, passwords)
+        return
+    chunksize = max(1, min(64, len(passwords) // (workers * 4)))
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    finished = False
+    try:
+        yield from executor.map(utils.get_password_hash, passwords, chunksize=chunksize)
+        finished = True
+    finally:
+        # Closed early (the consumer went away): cancel what is queued rather than hash it.
+        executor.shutdown(wait=finished, cancel_futures=not finished)
@@ -1,14 +1,15 @@
 from io import BytesIO
 from typing import Optional
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.pdfgen import canvas
-
 
 def render_pdf_template(
     student_name: str, excursion: dict, parent_fields: dict, signature_png: Optional[bytes]
 ) -> bytes:
+    # reportlab is imported on first use: it is only needed when a consent is signed.
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.pdfgen import canvas
+
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
     width, height = A4
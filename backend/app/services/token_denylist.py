@@ -0,0 +1,93 @@
+"""Used refresh tokens and revoked token families, shared by every worker through Redis.
+
+Refresh tokens are signed JWTs carrying the user id, a family id and their expiry, so
+``/auth/refresh`` validates one without reading ``refresh_tokens``; what it still has to know
+is whether the token was used before or its family revoked. Both are Redis keys set with a
+TTL equal to what is left of the token's (or the family's) lifetime, so the denylist never
+holds more than the tokens that could still be presented. A token is marked used with
+``SET NX``, which is also what makes two concurrent refreshes with one token yield one pair.
+
+Without Redis, or while its circuit breaker is open, the answer is ``None``: the caller has
+to decide from the ``refresh_tokens`` rows, which every rotation and logout updates as well.
+"""
+
+from prometheus_client import Counter
+
+from app import cache
+from app.core.config import get_settings
+
+settings = get_settings()
+
+refresh_token_reuse = Counter(
+    "refresh_token_reuse_total",
+    "Refresh tokens presented again after rotation; their family is revoked",
+)
+
+
+def _token_key(token_hash: str) -> str:
+    return f"auth:refresh:used:{token_hash}"
+
+
+def _family_key(family_id: str) -> str:
+    return f"auth:refresh:family:{family_id}"
+
+
+def family_ttl_seconds() -> int:
+    # The newest token of a family is at most this old, so nothing in it outlives the entry.
+    return settings.refresh_token_expire_days * 86400
+
+
+def _add(key: str, ttl_seconds: int) -> bool | None:
+    """Record ``key`` for ``ttl_seconds``; False if it was recorded already, None without Redis."""
+    client = cache.get_cache_client()
+    if not client:
+        return None
+
+    try:
+        added = client.set(key, b"1", nx=True, ex=max(int(ttl_seconds), 1))
+    except cache.RedisError:
+        cache.redis_breaker.record_failure()
+        return None
+    cache.redis_breaker.record_success()
+    return bool(added)
+
+
+def _contains(key: str) -> bool | None:
+    client = cache.get_cache_client()
+    if not client:
+        return None
+
+    try:
+        found = client.exists(key)
+    except cache.RedisError:
+        cache.redis_breaker.record_failure()
+        return None
+    cache.redis_breaker.record_success()
+    return bool(found)
+
+
+def use_token(token_hash: str, ttl_seconds: int) -> bool | None:
+    """Mark a refresh token as used; False if it had been used before, None without Redis."""
+    return _add(_token_key(token_hash), ttl_seconds)
+
+
+def release_token(token_hash: str) -> None:
+    """Undo ``use_token`` for a rotation that failed before issuing the next pair."""
+    client = cache.get_cache_client()
+    if not client:
+        return
+
+    try:
+        client.delete(_token_key(token_hash))
+    except cache.RedisError:
+        cache.redis_breaker.record_failure()
+        return
+    cache.redis_breaker.record_success()
+
+
+def revoke_family(family_id: str) -> None:
+    _add(_family_key(family_id), family_ttl_seconds())
+
+
+def is_family_revoked(family_id: str) -> bool | None:
+    return _contains(_family_key(family_id))
@@ -0,0 +1,104 @@
+"""Cached view of the user fields needed to authorise a request.
+
+``get_current_user`` resolves a bearer token to an ``AuthUser`` from the local cache tier, then
+Redis, and only then the database, so RBAC on hot endpoints normally runs without a query.
+Changing a user's password or role bumps ``User.token_version``: access tokens that carry the
+old version are rejected, and the cached entry is dropped on every worker once the change
+commits. Bulk ``UPDATE`` statements bypass the ORM events and must invalidate by hand.
+"""
+
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, object_session
+
+from app import models
+from app.cache import aget, aset, get_cached_response, invalidate_many, set_cached_response
+from app.core.config import get_settings
+
+settings = get_settings()
+
+USER_CACHE_ENDPOINT = "auth_user"
+_CHANGED_USERS = "auth_users_changed"
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """What the auth dependencies hand to routes instead of a session-bound ``models.User``."""
+
+    id: int
+    email: str
+    role: models.UserRole
+    token_version: int
+
+
+def user_cache_key(user_id: int) -> str:
+    return f"auth:user:{user_id}"
+
+
+def _to_entry(user: models.User) -> dict:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "role": user.role.name.value,
+        "token_version": user.token_version,
+    }
+
+
+def _from_entry(entry: dict) -> AuthUser:
+    return AuthUser(
+        id=entry["id"],
+        email=entry["email"],
+        role=models.UserRole(entry["role"]),
+        token_version=entry["token_version"],
+    )
+
+
+def get_auth_user(db: Session, user_id: int) -> AuthUser | None:
+    key = user_cache_key(user_id)
+    entry = get_cached_response(key, USER_CACHE_ENDPOINT)
+    if entry is None:
+        user = db.get(models.User, user_id, options=[joinedload(models.User.role)])
+        if user is None:
+            return None
+        entry = _to_entry(user)
+        set_cached_response(key, entry, ttl_seconds=settings.auth_user_cache_ttl_seconds)
+    return _from_entry(entry)
+
+
+async def aget_auth_user(db: AsyncSession, user_id: int) -> AuthUser | None:
+    key = user_cache_key(user_id)
+    entry = await aget(key, USER_CACHE_ENDPOINT)
+    if entry is None:
+        user = await db.get(models.User, user_id, options=[joinedload(models.User.role)])
+        if user is None:
+            return None
+        entry = _to_entry(user)
+        await aset(key, entry, ttl_seconds=settings.auth_user_cache_ttl_seconds)
+    return _from_entry(entry)
+
+
+@event.listens_for(models.User.password_hash, "set", active_history=True)
+@event.listens_for(models.User.role_id, "set", active_history=True)
+@event.listens_for(models.User.role, "set", active_history=True)
+def _bump_token_version(target: models.User, value, oldvalue, initiator) -> None:
+    # New users have no tokens yet; only changes to a stored user revoke anything.
+    if target.id is None or value is oldvalue or value == oldvalue:
+        return
+    target.token_version = (target.token_version or 0) + 1
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_USERS, None)
+    if changed:
+        invalidate_many(user_cache_key(user_id) for user_id in sorted(changed))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
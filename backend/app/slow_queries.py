@@ -0,0 +1,167 @@
+"""Slow query log with sampled EXPLAIN plans.
+
+Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are kept in a bounded ring buffer with their
+parameters redacted to type names. For a ``SLOW_QUERY_EXPLAIN_SAMPLE_RATE`` share of them the
+plan is captured right away on the same connection (``EXPLAIN QUERY PLAN`` on SQLite,
+``EXPLAIN`` elsewhere), inside a savepoint so that a failing ``EXPLAIN`` cannot abort the
+request's transaction. ``SlowQueryLog.top`` groups the buffer by statement for the admin API.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from prometheus_client import Counter
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+slow_queries_total = Counter("db_slow_queries_total", "Statements over the slow query threshold")
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN"}
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    parameters: Any
+    duration_ms: float
+    recorded_at: datetime
+    plan: list[str] | None = None
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Keep the shape of bound parameters, replacing every value with its type name."""
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+    return f"<{type(parameters).__name__}>"
+
+
+def redact_statement(statement: str) -> str:
+    """Drop string literals inlined into the SQL text itself."""
+    return _STRING_LITERAL.sub("'?'", " ".join(statement.split()))
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, explain_sample_rate: float, max_entries: int) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self._entries: deque[SlowQuery] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def configure(self, threshold_ms: float, explain_sample_rate: float, max_entries: int) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        with self._lock:
+            self._entries = deque(self._entries, maxlen=max_entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def entries(self) -> list[SlowQuery]:
+        with self._lock:
+            return list(self._entries)
+
+    def record(self, conn, statement: str, parameters: Any, duration_ms: float) -> None:
+        plan = None
+        if _EXPLAINABLE.match(statement) and random.random() < self.explain_sample_rate:
+            plan = self._explain(conn, statement, parameters)
+        entry = SlowQuery(
+            statement=redact_statement(statement),
+            parameters=redact_parameters(parameters),
+            duration_ms=round(duration_ms, 3),
+            recorded_at=datetime.now(timezone.utc),
+            plan=plan,
+        )
+        slow_queries_total.inc()
+        logger.warning(
+            "Slow query",
+            extra={"duration_ms": entry.duration_ms, "statement": entry.statement[:500]},
+        )
+        with self._lock:
+            self._entries.append(entry)
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters: Any) -> list[str] | None:
+        prefix = _EXPLAIN_PREFIXES.get(conn.dialect.name, "EXPLAIN")
+        conn.info["explaining"] = True
+        try:
+            # On Postgres an error aborts the whole transaction; the savepoint confines it.
+            with conn.begin_nested():
+                rows = conn.exec_driver_sql(f"{prefix} {statement}", parameters).all()
+        except Exception:  # a missing plan must never fail the request
+            logger.exception("EXPLAIN of a slow query failed")
+            return None
+        finally:
+            conn.info["explaining"] = False
+        return [str(row[-1]) for row in rows]
+
+    def top(self, limit: int) -> list[dict]:
+        """Slowest statements first, each with its count, timings and most recent plan."""
+        groups: dict[str, dict] = {}
+        for entry in self.entries():
+            group = groups.setdefault(
+                entry.statement,
+                {"statement": entry.statement, "count": 0, "total_ms": 0.0, "max_ms": 0.0},
+            )
+            group["count"] += 1
+            group["total_ms"] += entry.duration_ms
+            group["max_ms"] = max(group["max_ms"], entry.duration_ms)
+            group["last_seen"] = entry.recorded_at
+            group["parameters"] = entry.parameters
+            if entry.plan is not None:
+                group["plan"] = entry.plan
+        ranked = sorted(groups.values(), key=lambda group: group["max_ms"], reverse=True)
+        return [
+            {
+                "statement": group["statement"],
+                "count": group["count"],
+                "max_ms": group["max_ms"],
+                "mean_ms": round(group["total_ms"] / group["count"], 3),
+                "last_seen": group["last_seen"],
+                "parameters": group["parameters"],
+                "plan": group.get("plan"),
+            }
+            for group in ranked[:limit]
+        ]
+
+
+slow_query_log = SlowQueryLog(threshold_ms=200, explain_sample_rate=0.1, max_entries=200)
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._slow_query_started_at = time.perf_counter()
+
+
+def _check_duration(conn, cursor, statement, parameters, context, executemany) -> None:
+    started_at = getattr(context, "_slow_query_started_at", None)
+    if started_at is None or executemany or conn.info.get("explaining"):
+        return
+    duration_ms = (time.perf_counter() - started_at) * 1000
+    if duration_ms >= slow_query_log.threshold_ms:
+        slow_query_log.record(conn, statement, parameters, duration_ms)
+
+
+def setup_slow_query_log(settings: Settings) -> None:
+    slow_query_log.configure(
+        settings.slow_query_threshold_ms,
+        settings.slow_query_explain_sample_rate,
+        settings.slow_query_buffer_size,
+    )
+    if not event.contains(Engine, "before_cursor_execute", _start_timer):
+        event.listen(Engine, "before_cursor_execute", _start_timer)
+        event.listen(Engine, "after_cursor_execute", _check_duration)
@@ -59,7 +59,7 @@ def setup_db():
 @pytest.fixture(autouse=True)
 def stub_password_hash(monkeypatch):
     monkeypatch.setattr("app.utils.get_password_hash", lambda password: "hashed")
-    monkeypatch.setattr("app.routes.admin.get_password_hash", lambda password: "hashed")
+    monkeypatch.setattr("app.routes.admin.hash_password", lambda password: "hashed")
 
 
 def test_admin_can_create_user(setup_db: Session):
@@ -0,0 +1,59 @@
+"""Delete expired and revoked refresh tokens so the table stays the size of the live sessions."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from prometheus_client import Counter
+
+from app.core.config import get_settings
+from app.db import SessionLocal
+from app.services.auth import purge_refresh_tokens
+
+logger = logging.getLogger(__name__)
+
+purged_refresh_tokens = Counter(
+    "refresh_tokens_purged_total", "Expired or revoked refresh tokens deleted by the purge job"
+)
+
+
+def purge_once(batch_size: int | None = None) -> int:
+    batch_size = batch_size or get_settings().refresh_token_purge_batch_size
+    with SessionLocal() as db:
+        deleted = purge_refresh_tokens(db, batch_size)
+    purged_refresh_tokens.inc(deleted)
+    if deleted:
+        logger.info("Refresh tokens purged", extra={"deleted": deleted})
+    return deleted
+
+
+async def run_purge_loop(interval_seconds: float) -> None:
+    """Purge every ``interval_seconds`` until cancelled.
+
+    Every worker runs its own loop; the deletes are idempotent, so overlapping runs only repeat
+    work that finds nothing.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(purge_once)
+        except Exception:  # a failed purge is retried on the next tick
+            logger.exception("Refresh token purge failed")
+        await asyncio.sleep(interval_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="rows deleted per transaction (REFRESH_TOKEN_PURGE_BATCH_SIZE)",
+    )
+    args = parser.parse_args()
+    print(f"Deleted refresh tokens: {purge_once(args.batch_size)}")
+
+
+if __name__ == "__main__":
+    main()
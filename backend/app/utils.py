@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta
+from secrets import token_urlsafe
 from typing import Optional
 
-from jose import jwt
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import get_settings
@@ -18,8 +19,42 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(subject: str, expires_minutes: Optional[int] = None) -> str:
+def create_access_token(
+    subject: str,
+    expires_minutes: Optional[int] = None,
+    role: Optional[str] = None,
+    token_version: Optional[int] = None,
+) -> str:
     expire_delta = timedelta(minutes=expires_minutes or settings.access_token_expire_minutes)
     expire = datetime.utcnow() + expire_delta
     to_encode = {"sub": subject, "exp": expire}
+    if role is not None:
+        to_encode["role"] = role
+    if token_version is not None:
+        to_encode["ver"] = token_version
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
+
+def create_refresh_token(subject: str, family_id: str, expires_at: datetime) -> str:
+    """Signed refresh token; ``fam`` ties every rotation of one sign-in together."""
+    to_encode = {
+        "sub": subject,
+        "fam": family_id,
+        "jti": token_urlsafe(16),
+        "exp": expires_at,
+        "typ": "refresh",
+    }
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
+
+def decode_refresh_token(token: str, verify_exp: bool = True) -> dict:
+    """Verified claims of a refresh token; raises ``JWTError`` for anything else."""
+    claims = jwt.decode(
+        token,
+        settings.secret_key,
+        algorithms=[settings.algorithm],
+        options={"verify_exp": verify_exp},
+    )
+    if claims.get("typ") != "refresh" or not claims.get("fam"):
+        raise JWTError("Not a refresh token")
+    return claims
@@ -0,0 +1,136 @@
+"""Compare requests/sec of a sync (threadpool) route and an async route doing the same query.
+
+Both routes list the latest excursions: one through ``SessionLocal`` in a ``def`` route, the
+other through ``AsyncSessionLocal`` in an ``async def`` route. Requests are sent in-process
+through ``httpx.ASGITransport`` with the given concurrency, so the numbers show the cost of
+the threadpool hop and its size limit rather than network overhead. Point ``--database-url``
+at Postgres to include real round-trip latency; by default a temporary SQLite file is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from app import models, schemas  # noqa: E402
+from app.db import Base, to_async_url  # noqa: E402
+
+
+def seed(session: Session, count: int) -> None:
+    if session.query(models.Excursion).count() >= count:
+        return
+    created_at = datetime(2024, 9, 1, 8, 30)
+    session.add(models.User(id=1, email="bench@example.com", password_hash="-", role_id=1))
+    session.add(models.Role(id=1, name=models.UserRole.teacher))
+    session.add_all(
+        models.Excursion(
+            student_class=f"{5 + i % 6}{'АБВ'[i % 3]}",
+            date=(created_at + timedelta(days=i % 200)).date(),
+            location=f"Государственный музей №{i % 50}",
+            price=500 + i % 10 * 100,
+            created_by=1,
+            created_at=created_at + timedelta(minutes=i),
+        )
+        for i in range(count)
+    )
+    session.commit()
+
+
+def build_app(database_url: str, page_size: int) -> FastAPI:
+    sync_engine = create_engine(database_url)
+    sync_session = sessionmaker(bind=sync_engine, autoflush=False)
+    async_engine = create_async_engine(to_async_url(database_url))
+    async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+    query = select(models.Excursion).order_by(models.Excursion.created_at.desc()).limit(page_size)
+
+    def get_db():
+        with sync_session() as db:
+            yield db
+
+    async def get_async_db():
+        async with async_session() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync", response_model=list[schemas.ExcursionOut])
+    def sync_route(db: Session = Depends(get_db)):
+        return db.scalars(query).all()
+
+    @app.get("/async", response_model=list[schemas.ExcursionOut])
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        return (await db.scalars(query)).all()
+
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker() -> None:
+            for _ in remaining:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        await client.get(path)  # warm connections and compiled statements
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def compare(app: FastAPI, args: argparse.Namespace) -> None:
+    # One event loop for every run: async pool connections are bound to the loop.
+    print(f"{'concurrency':>11} {'sync req/s':>12} {'async req/s':>12}")
+    for concurrency in args.concurrency:
+        row = [f"{concurrency:>11}"]
+        for path in ("/sync", "/async"):
+            try:
+                row.append(f"{await run(app, path, args.requests, concurrency):>12.0f}")
+            except Exception as exc:  # pool timeouts are a result, not a crash
+                row.append(f"{type(exc).__name__:>12}")
+        print(" ".join(row))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=None, help="sync URL, e.g. postgresql://...")
+    parser.add_argument("--excursions", type=int, default=1_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 200])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            seed(session, args.excursions)
+        engine.dispose()
+
+        print(f"{args.requests} requests, page of {args.page_size}, {database_url}")
+        asyncio.run(compare(build_app(database_url, args.page_size), args))
+
+
+if __name__ == "__main__":
+    main()
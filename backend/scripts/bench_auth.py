@@ -0,0 +1,144 @@
+"""Authenticated requests/sec: per-request user lookup vs the cached auth user.
+
+Two routes return the same tiny payload behind an admin-only check. ``/legacy`` resolves the
+token the way ``get_current_user`` used to (``db.get`` on the user, then a lazy load of its
+role); ``/cached`` uses ``require_roles`` from ``app.dependencies.auth``, which reads the role
+and token version from the user cache. Requests go through ``httpx.ASGITransport`` so the
+numbers show the dependency cost, not the network. The local tier only fills while the
+Redis invalidation listener runs, so the cache needs Redis: ``--redis-url`` for a real server,
+otherwise an in-process fakeredis one. Either way most requests are served by the local tier,
+as in each worker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI, Header, HTTPException  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from app import cache, models  # noqa: E402
+from app.db import Base, get_db  # noqa: E402
+from app.dependencies.auth import _token_claims, require_roles  # noqa: E402
+from app.services.auth import ensure_role, issue_tokens  # noqa: E402
+from app.services.user_cache import user_cache_key  # noqa: E402
+
+
+def connect_cache(redis_url: str | None) -> str:
+    if redis_url:
+        cache.settings.redis_url = redis_url
+    else:
+        import fakeredis
+
+        cache.Redis = fakeredis.FakeRedis
+        cache.REDIS_AVAILABLE = True
+    if cache.get_cache_client() is None:
+        raise SystemExit(f"Redis at {cache.settings.redis_url} is not reachable")
+    return redis_url or "fakeredis"
+
+
+def build_app(database_url: str) -> tuple[FastAPI, str, list[int]]:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    with factory() as db:
+        user = models.User(
+            email="bench@example.com",
+            password_hash="-",
+            role=ensure_role(db, models.UserRole.admin),
+        )
+        db.add(user)
+        db.commit()
+        token = issue_tokens(db, user).access_token
+        # A previous run against the same Redis may have cached another user under this id.
+        cache.invalidate_many([user_cache_key(user.id)])
+
+    queries = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany) -> None:
+        queries[0] += 1
+
+    def override_get_db():
+        with factory() as db:
+            yield db
+
+    def legacy_admin(
+        db: Session = Depends(get_db), authorization: str | None = Header(default=None)
+    ) -> models.User:
+        user = db.get(models.User, _token_claims(authorization)["sub"])
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        if user.role.name != models.UserRole.admin:
+            raise HTTPException(status_code=403, detail="Forbidden")
+        return user
+
+    app = FastAPI()
+    app.dependency_overrides[get_db] = override_get_db
+
+    @app.get("/legacy")
+    def legacy_route(current_user=Depends(legacy_admin)):
+        return {"id": current_user.id}
+
+    @app.get("/cached")
+    def cached_route(current_user=Depends(require_roles(models.UserRole.admin))):
+        return {"id": current_user.id}
+
+    return app, token, queries
+
+
+async def run(app: FastAPI, path: str, token: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker() -> None:
+            for _ in remaining:
+                response = await client.get(path, headers=headers)
+                response.raise_for_status()
+
+        await client.get(path, headers=headers)  # fill the cache, compile statements
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def compare(app: FastAPI, token: str, queries: list[int], args) -> None:
+    print(f"{'concurrency':>11} {'route':>8} {'req/s':>8} {'queries/req':>12}")
+    for concurrency in args.concurrency:
+        for path in ("/legacy", "/cached"):
+            before = queries[0]
+            rate = await run(app, path, token, args.requests, concurrency)
+            per_request = (queries[0] - before) / (args.requests + 1)
+            print(f"{concurrency:>11} {path:>8} {rate:>8.0f} {per_request:>12.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=None, help="sync URL, e.g. postgresql://...")
+    parser.add_argument("--redis-url", default=None, help="real Redis instead of fakeredis")
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 20])
+    args = parser.parse_args()
+
+    redis = connect_cache(args.redis_url)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        app, token, queries = build_app(database_url)
+        print(f"{args.requests} authenticated requests, {database_url}, {redis}")
+        asyncio.run(compare(app, token, queries, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare cache payload codecs against the legacy JSON text path.
+
+Builds the ``teacher:excursions`` payload for N excursions (10k by default) and reports
+payload size plus encode/decode time for every installed codec and compression.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app import schemas  # noqa: E402
+from app.cache_codecs import CODECS, COMPRESSIONS, CacheSerializer  # noqa: E402
+
+
+def build_payload(count: int) -> list[dict]:
+    created_at = datetime(2024, 9, 1, 8, 30)
+    return [
+        schemas.ExcursionOut(
+            id=i,
+            student_class=f"{5 + i % 6}{'АБВ'[i % 3]}",
+            date=(created_at + timedelta(days=i % 200)).strftime("%Y-%m-%d"),
+            location=f"Государственный музей №{i % 50}",
+            price=500 + i % 10 * 100,
+            description="Экскурсия в рамках урока истории искусства и обзор экспозиции",
+            created_by=1 + i % 20,
+            created_at=created_at + timedelta(minutes=i),
+        ).model_dump()
+        for i in range(count)
+    ]
+
+
+def measure(encode, decode, rounds: int) -> tuple[int, float, float]:
+    data = encode()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        data = encode()
+    encode_ms = (time.perf_counter() - started) / rounds * 1000
+    started = time.perf_counter()
+    for _ in range(rounds):
+        decode(data)
+    decode_ms = (time.perf_counter() - started) / rounds * 1000
+    return len(data), encode_ms, decode_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--excursions", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = build_payload(args.excursions)
+    rows = [
+        (
+            "legacy json text",
+            *measure(lambda: json.dumps(payload, default=str), json.loads, args.rounds),
+        )
+    ]
+    for codec in CODECS:
+        for compression in COMPRESSIONS:
+            serializer = CacheSerializer(codec, compression, compression_min_bytes=1024)
+            rows.append(
+                (
+                    f"{codec} + {compression}",
+                    *measure(lambda: serializer.dumps(payload), serializer.loads, args.rounds),
+                )
+            )
+
+    print(f"teacher:excursions payload, {args.excursions} excursions, {args.rounds} rounds")
+    print(f"{'codec':<20} {'bytes':>10} {'encode ms':>10} {'decode ms':>10}")
+    for name, size, encode_ms, decode_ms in rows:
+        print(f"{name:<20} {size:>10} {encode_ms:>10.2f} {decode_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
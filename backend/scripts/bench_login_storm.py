@@ -0,0 +1,103 @@
+"""Latency of an unrelated endpoint while a wave of logins is being verified.
+
+A small app has a ``def`` login route that verifies a pbkdf2 password, the way
+``authenticate_user`` does, and a cheap ``/ping`` route. A storm of concurrent logins runs
+while a probe keeps calling ``/ping`` one request at a time; the probe's p50/p99 are reported
+for hashing inline in the request thread (``PASSWORD_HASH_WORKERS=0``, the old behaviour) and
+through the process pool of ``app.services.hashing``. Requests go through
+``httpx.ASGITransport``, so sync routes run in the same AnyIO threadpool as under uvicorn.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, HTTPException  # noqa: E402
+
+from app import utils  # noqa: E402
+from app.services import hashing  # noqa: E402
+
+
+def build_app() -> FastAPI:
+    stored_hash = utils.get_password_hash("secret123")
+    app = FastAPI()
+
+    @app.post("/login")
+    def login():
+        if not hashing.verify_password("secret123", stored_hash):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def percentile(samples: list[float], share: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))] * 1000
+
+
+async def storm(app: FastAPI, logins: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/login")  # start the hashing processes before measuring
+        remaining = iter(range(logins))
+        done = asyncio.Event()
+        probe_latencies: list[float] = []
+
+        async def login_worker() -> None:
+            for _ in remaining:
+                (await client.post("/login")).raise_for_status()
+
+        async def probe() -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                (await client.get("/ping")).raise_for_status()
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return {
+        "logins/s": logins / elapsed,
+        "ping p50 ms": percentile(probe_latencies, 0.50),
+        "ping p99 ms": percentile(probe_latencies, 0.99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    args = parser.parse_args()
+
+    print(f"{args.logins} logins, {args.concurrency} at a time")
+    print("hash workers logins/s ping p50 ms ping p99 ms")
+    app = build_app()
+    for workers in args.workers:
+        hashing.settings.password_hash_workers = workers
+        result = asyncio.run(storm(app, args.logins, args.concurrency))
+        hashing.shutdown_executor()
+        cells = " ".join(f"{value:>{len(key)}.1f}" for key, value in result.items())
+        print(f"{workers:>12} {cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Signature write throughput on a SQLite file, default engine vs the SQLite profile of ``app.db``.
+
+Worker threads (like FastAPI's threadpool running ``sign_excursion``) each load an excursion and
+a student and insert a signature in its own transaction, while reader threads keep listing the
+latest excursions. The default setup is a plain ``create_engine`` with a rollback journal and a
+5+10 connection pool; the profile is WAL with one writer connection and a pool of ``query_only``
+readers, routed through ``RoutingSession`` exactly as in the app. Lock errors are counted rather
+than retried, since each one is a failed request in production.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine, exc, select  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from app import models  # noqa: E402
+from app.db import Base, create_sqlite_engine  # noqa: E402
+from app.db_routing import ReplicaSet, RoutingSession  # noqa: E402
+
+
+def seed(database_url: str, excursions: int, students: int) -> None:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(models.Role(id=1, name=models.UserRole.teacher))
+        session.add(models.User(id=1, email="bench@example.com", password_hash="-", role_id=1))
+        session.add_all(
+            models.Excursion(
+                student_class="5А",
+                date=date(2024, 9, 1) + timedelta(days=i % 200),
+                location=f"Музей №{i}",
+                created_by=1,
+                created_at=datetime(2024, 9, 1) + timedelta(minutes=i),
+            )
+            for i in range(excursions)
+        )
+        session.add_all(
+            models.Student(name=f"Ученик {i}", student_class="5А", parent_email=f"p{i}@example.com")
+            for i in range(students)
+        )
+        session.commit()
+    engine.dispose()
+
+
+def default_sessions(database_url: str) -> tuple[sessionmaker, sessionmaker, list]:
+    engine = create_engine(database_url, pool_size=5, max_overflow=10)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    return factory, factory, [engine]
+
+
+def profile_sessions(database_url: str) -> tuple[sessionmaker, sessionmaker, list]:
+    writer = create_sqlite_engine(database_url, "bench-writer", writer=True)
+    reader = create_sqlite_engine(database_url, "bench-reader", writer=False)
+    factory = sessionmaker(
+        bind=writer, class_=RoutingSession, replicas=ReplicaSet([reader]), autoflush=False
+    )
+    return factory, lambda: factory(info={"read_only": True}), [writer, reader]
+
+
+def run(database_url: str, sessions, args: argparse.Namespace) -> dict:
+    write_session, read_session, engines = sessions(database_url)
+    latencies: list[float] = []
+    errors = 0
+    reads = 0
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def sign(index: int) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            with write_session() as db:
+                excursion = db.get(models.Excursion, index % args.excursions + 1)
+                student = db.get(models.Student, index % args.students + 1)
+                db.add(
+                    models.Signature(
+                        excursion_id=excursion.id,
+                        student_id=student.id,
+                        mode=models.SignatureMode.vector,
+                        strokes=[[0, 0], [index, index]],
+                        metadata_json={},
+                        pdf_path=f"archive/{index}.pdf",
+                    )
+                )
+                db.commit()
+        except exc.OperationalError:
+            with lock:
+                errors += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    def read() -> None:
+        nonlocal reads
+        query = select(models.Excursion).order_by(models.Excursion.created_at.desc()).limit(50)
+        while not stop.is_set():
+            try:
+                with read_session() as db:
+                    db.scalars(query).all()
+            except exc.OperationalError:
+                continue
+            with lock:
+                reads += 1
+
+    readers = [threading.Thread(target=read) for _ in range(args.readers)]
+    for reader in readers:
+        reader.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.writers) as executor:
+        list(executor.map(sign, range(args.signatures)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for reader in readers:
+        reader.join()
+    for engine in engines:
+        engine.dispose()
+
+    latencies.sort()
+    return {
+        "signs/s": len(latencies) / elapsed,
+        "reads/s": reads / elapsed,
+        "errors": errors,
+        "p50 ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95 ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--signatures", type=int, default=2_000)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--excursions", type=int, default=500)
+    parser.add_argument("--students", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{args.signatures} signatures, {args.readers} concurrent readers")
+    header = ["setup", "writers", "signs/s", "reads/s", "errors", "p50 ms", "p95 ms"]
+    print(" ".join(f"{column:>9}" for column in header))
+    for writers in args.writers:
+        for name, sessions in (("default", default_sessions), ("profile", profile_sessions)):
+            with tempfile.TemporaryDirectory() as tmp:
+                database_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+                seed(database_url, args.excursions, args.students)
+                run_args = argparse.Namespace(**{**vars(args), "writers": writers})
+                result = run(database_url, sessions, run_args)
+            cells = [name, writers, *(round(value, 1) for value in result.values())]
+            print(" ".join(f"{cell:>9}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
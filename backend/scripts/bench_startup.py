@@ -0,0 +1,73 @@
+"""Measure the cold import time of ``app.main`` with ``python -X importtime``.
+
+Each run starts a fresh interpreter (no shared module cache), so the number is what every
+uvicorn worker and every test session pays before serving anything. The report shows the median
+total and the slowest top-level packages by cumulative time; ``--budget-ms`` turns it into a
+check that fails when the median import exceeds the budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_times(module: str, env: dict) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, as reported by ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        # A module imported from several places is reported once, at its first import.
+        times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    totals = []
+    packages: dict[str, list[int]] = defaultdict(list)
+    with tempfile.TemporaryDirectory() as tmp:
+        # An unused database proves the import itself does not connect anywhere.
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{Path(tmp) / 'startup.db'}"}
+        for _ in range(args.runs):
+            times = import_times(args.module, env)
+            totals.append(times[args.module])
+            for name, cumulative in times.items():
+                if "." not in name and name != args.module:
+                    packages[name].append(cumulative)
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"{args.module}: median {median_ms:.0f} ms over {args.runs} cold imports")
+    slowest = sorted(packages.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, samples in slowest[: args.top]:
+        print(f"  {statistics.median(samples) / 1000:>8.1f} ms  {name}")
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        sys.exit(f"import of {args.module} took {median_ms:.0f} ms, budget {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
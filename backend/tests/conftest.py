@@ -4,3 +4,87 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+import fakeredis  # noqa: E402
+import fakeredis.aioredis  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app import cache  # noqa: E402
+from app.cache import local_cache  # noqa: E402
+from app.db import Base, get_async_db, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.auth import ensure_default_roles  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_cache():
+    # Cached auth users are keyed by id, and every test database starts its ids at 1.
+    local_cache.clear()
+    yield
+    local_cache.clear()
+
+
+@pytest.fixture()
+def fake_redis(monkeypatch):
+    """Point the cache at fakeredis; the local tier only fills while its listener runs."""
+    monkeypatch.setattr(cache, "Redis", fakeredis.FakeRedis)
+    monkeypatch.setattr(cache, "AsyncRedis", fakeredis.aioredis.FakeRedis)
+    monkeypatch.setattr(cache, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(cache, "_cache_client", None)
+    monkeypatch.setattr(cache, "_async_cache_client", None)
+    monkeypatch.setattr(cache, "_invalidation_listener", None)
+    monkeypatch.setattr(cache, "redis_breaker", cache.CircuitBreaker(3, 5, 60))
+    client = cache.get_cache_client()
+    client.flushall()
+    yield client
+    if cache._invalidation_listener is not None:
+        cache._invalidation_listener.stop()
+
+
+@pytest.fixture()
+def db_urls(tmp_path):
+    # Sync and async sessions must see the same data, so the database is a file.
+    path = tmp_path / "test.db"
+    return f"sqlite+pysqlite:///{path}", f"sqlite+aiosqlite:///{path}"
+
+
+@pytest.fixture()
+def db_session(db_urls):
+    engine = create_engine(db_urls[0], connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    ensure_default_roles(session)
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture()
+def client(db_session, db_urls):
+    """TestClient whose sync and async sessions share the file database of ``db_session``."""
+    async_engine = create_async_engine(db_urls[1], poolclass=NullPool)
+    async_session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def override_get_db():
+        try:
+            yield db_session
+        finally:
+            pass
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
@@ -1,12 +1,27 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from jose import jwt
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app import cache, models
+from app.core.config import get_settings
 from app.db import Base, get_db
 from app.main import app
-from app.services.auth import ensure_default_roles
+from app.services import token_denylist
+from app.services.auth import (
+    ensure_default_roles,
+    ensure_role,
+    hash_refresh_token,
+    purge_refresh_tokens,
+)
+from app.utils import create_access_token, create_refresh_token, get_password_hash
 
 SQLALCHEMY_DATABASE_URL = "sqlite+pysqlite:///:memory:"
 engine = create_engine(
@@ -87,7 +102,7 @@ def test_login_success_and_invalid_password(client):
     }
 
 
-def test_refresh_rotates_token_and_rejects_revoked(client):
+def test_refresh_rotates_token_and_reuse_revokes_the_family(client):
     register_payload = {"email": "refresh@example.com", "password": "secret123", "role": "teacher"}
     register_response = client.post("/auth/register", json=register_payload)
     refresh_token = register_response.json()["refresh_token"]
@@ -105,8 +120,9 @@ def test_refresh_rotates_token_and_rejects_revoked(client):
         "details": None,
     }
 
+    # The old token came back after rotation, so its successor is revoked with it.
     rotated_refresh = client.post("/auth/refresh", json={"refresh_token": new_refresh})
-    assert rotated_refresh.status_code == 200
+    assert rotated_refresh.status_code == 401
 
 
 def test_logout_revokes_refresh_token(client):
@@ -125,3 +141,281 @@ def test_logout_revokes_refresh_token(client):
         "message": "Invalid refresh token",
         "details": None,
     }
+
+
+def register(client, email: str, role: str = "admin") -> dict:
+    response = client.post(
+        "/auth/register", json={"email": email, "password": "secret123", "role": role}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_access_token_carries_role_and_token_version(client):
+    token = register(client, "claims@example.com", role="teacher")["access_token"]
+
+    settings = get_settings()
+    claims = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    assert claims["role"] == "teacher"
+    assert claims["ver"] == 0
+
+
+def test_authorized_requests_hit_the_user_cache_not_the_database(client, fake_redis):
+    headers = bearer(register(client, "cached@example.com")["access_token"])
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.get("/admin/slow-queries", headers=headers).status_code == 200
+        assert len(statements) == 1  # the user is loaded once, role included
+        assert client.get("/admin/slow-queries", headers=headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) == 1
+
+
+def test_claimed_role_is_rejected_without_loading_the_user(client):
+    headers = bearer(register(client, "claimed@example.com", role="teacher")["access_token"])
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/admin/slow-queries", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 403
+    assert statements == []
+
+
+def test_tokens_without_version_stop_working_after_a_password_change(client, db_session):
+    register(client, "legacy@example.com")
+    user = db_session.query(models.User).filter_by(email="legacy@example.com").one()
+    headers = bearer(create_access_token(str(user.id)))
+    assert client.get("/admin/slow-queries", headers=headers).status_code == 200
+
+    user.password_hash = get_password_hash("changed123")
+    db_session.commit()
+
+    response = client.get("/admin/slow-queries", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["message"] == "Token revoked"
+
+
+def test_password_change_revokes_access_tokens(client, db_session):
+    headers = bearer(register(client, "rotate@example.com")["access_token"])
+    assert client.get("/admin/slow-queries", headers=headers).status_code == 200
+
+    user = db_session.query(models.User).filter_by(email="rotate@example.com").one()
+    user.password_hash = get_password_hash("changed123")
+    db_session.commit()
+
+    response = client.get("/admin/slow-queries", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["message"] == "Token revoked"
+    login = client.post(
+        "/auth/login", json={"email": "rotate@example.com", "password": "changed123"}
+    )
+    headers = bearer(login.json()["access_token"])
+    assert client.get("/admin/slow-queries", headers=headers).status_code == 200
+
+
+def test_role_change_applies_to_the_next_token(client, db_session):
+    headers = bearer(register(client, "demoted@example.com")["access_token"])
+    assert client.get("/admin/slow-queries", headers=headers).status_code == 200
+
+    user = db_session.query(models.User).filter_by(email="demoted@example.com").one()
+    user.role = ensure_role(db_session, models.UserRole.parent)
+    db_session.commit()
+
+    assert client.get("/admin/slow-queries", headers=headers).status_code == 401
+    login = client.post(
+        "/auth/login", json={"email": "demoted@example.com", "password": "secret123"}
+    )
+    headers = bearer(login.json()["access_token"])
+    assert client.get("/admin/slow-queries", headers=headers).status_code == 403
+
+
+def test_refresh_tokens_are_stored_hashed_and_rotated_in_one_commit(client, db_session):
+    refresh_token = register(client, "hashed@example.com")["refresh_token"]
+    stored = db_session.query(models.RefreshToken).one()
+    assert stored.token_hash == hash_refresh_token(refresh_token)
+    assert refresh_token not in stored.token_hash
+
+    commits = []
+
+    def record(session):
+        commits.append(session)
+
+    event.listen(db_session, "after_commit", record)
+    try:
+        response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    finally:
+        event.remove(db_session, "after_commit", record)
+
+    assert response.status_code == 200
+    assert len(commits) == 1
+    db_session.expire_all()
+    rows = {row.token_hash: row.revoked for row in db_session.query(models.RefreshToken)}
+    assert rows == {
+        hash_refresh_token(refresh_token): True,
+        hash_refresh_token(response.json()["refresh_token"]): False,
+    }
+
+
+def test_purge_deletes_expired_and_revoked_tokens_in_batches(db_session):
+    user = models.User(
+        email="purge@example.com",
+        password_hash="-",
+        role=ensure_role(db_session, models.UserRole.parent),
+    )
+    now = datetime(2024, 9, 1)
+    for index in range(7):
+        db_session.add(
+            models.RefreshToken(
+                token_hash=f"{index:064d}",
+                user=user,
+                expires_at=now + timedelta(days=1 if index % 2 else -1),
+                revoked=index == 5,
+            )
+        )
+    db_session.commit()
+
+    assert purge_refresh_tokens(db_session, batch_size=2, now=now) == 5
+    remaining = db_session.scalars(select(models.RefreshToken.token_hash)).all()
+    assert sorted(remaining) == [f"{1:064d}", f"{3:064d}"]
+    assert purge_refresh_tokens(db_session, batch_size=2, now=now) == 0
+
+
+def test_refresh_only_writes_the_refresh_token_table(client, fake_redis):
+    tokens = register(client, "write-only@example.com")
+    client.get("/admin/slow-queries", headers=bearer(tokens["access_token"]))
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert statements
+    assert not [statement for statement in statements if statement.startswith("SELECT")]
+
+
+def test_logout_revokes_every_token_of_the_session(client, db_session):
+    first = register(client, "family@example.com")["refresh_token"]
+    second = client.post("/auth/refresh", json={"refresh_token": first}).json()["refresh_token"]
+    other_session = client.post(
+        "/auth/login", json={"email": "family@example.com", "password": "secret123"}
+    ).json()["refresh_token"]
+
+    assert client.post("/auth/logout", json={"refresh_token": first}).status_code == 200
+
+    assert client.post("/auth/refresh", json={"refresh_token": second}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": other_session}).status_code == 200
+    rows = db_session.execute(select(models.RefreshToken.token_hash, models.RefreshToken.revoked))
+    revoked = dict(rows.all())
+    assert revoked[hash_refresh_token(second)] is True
+    assert client.post("/auth/logout", json={"refresh_token": "garbage"}).status_code == 404
+
+
+def test_refresh_token_is_not_an_access_token(client):
+    tokens = register(client, "typ@example.com")
+    response = client.get("/admin/slow-queries", headers=bearer(tokens["refresh_token"]))
+    assert response.status_code == 401
+
+
+def test_expired_refresh_token_is_rejected(client, db_session):
+    register(client, "expired@example.com")
+    user = db_session.scalars(select(models.User).filter_by(email="expired@example.com")).one()
+    token = create_refresh_token(str(user.id), "f" * 32, datetime.utcnow() - timedelta(seconds=1))
+
+    response = client.post("/auth/refresh", json={"refresh_token": token})
+
+    assert response.status_code == 401
+    assert response.json()["message"] == "Refresh token expired"
+
+
+def test_denylist_is_shared_through_redis(monkeypatch):
+    monkeypatch.setattr(cache, "Redis", fakeredis.FakeRedis)
+    monkeypatch.setattr(cache, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(cache, "_cache_client", None)
+    monkeypatch.setattr(cache, "_start_invalidation_listener", lambda client: None)
+    monkeypatch.setattr(cache, "redis_breaker", cache.CircuitBreaker(3, 5, 60))
+    client = cache.get_cache_client()
+    client.flushall()
+
+    assert token_denylist.use_token("a" * 64, ttl_seconds=120)
+    token_denylist.revoke_family("family")
+
+    assert not token_denylist.use_token("a" * 64, ttl_seconds=120)
+    assert token_denylist.is_family_revoked("family")
+    assert not token_denylist.is_family_revoked("other")
+    assert 0 < client.ttl("auth:refresh:used:" + "a" * 64) <= 120
+    assert client.ttl("auth:refresh:family:family") == token_denylist.family_ttl_seconds()
+
+
+def reuse_count() -> float:
+    return token_denylist.refresh_token_reuse._value.get()
+
+
+def test_without_redis_the_token_rows_decide(client, monkeypatch):
+    monkeypatch.setattr(cache, "REDIS_AVAILABLE", False)
+    first = register(client, "no-redis@example.com")["refresh_token"]
+    second = client.post("/auth/refresh", json={"refresh_token": first}).json()["refresh_token"]
+    reuses = reuse_count()
+
+    assert client.post("/auth/refresh", json={"refresh_token": first}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": second}).status_code == 401
+    assert reuse_count() == reuses + 1
+
+    logged_out = client.post(
+        "/auth/login", json={"email": "no-redis@example.com", "password": "secret123"}
+    ).json()["refresh_token"]
+    assert client.post("/auth/logout", json={"refresh_token": logged_out}).status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": logged_out}).status_code == 401
+    assert reuse_count() == reuses + 1
+
+
+def test_logout_during_a_redis_outage_holds_once_redis_is_back(client, fake_redis, monkeypatch):
+    refresh_token = register(client, "outage@example.com")["refresh_token"]
+
+    with monkeypatch.context() as outage:
+        outage.setattr(cache, "get_cache_client", lambda: None)
+        assert client.post("/auth/logout", json={"refresh_token": refresh_token}).status_code == 200
+
+    assert not fake_redis.keys("auth:refresh:*")
+    response = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+
+
+def test_refresh_can_be_retried_after_a_failed_commit(client, db_session, fake_redis, monkeypatch):
+    refresh_token = register(client, "retry@example.com")["refresh_token"]
+
+    def locked():
+        raise OperationalError("COMMIT", {}, sqlite3.OperationalError("database is locked"))
+
+    with monkeypatch.context() as busy:
+        busy.setattr(db_session, "commit", locked)
+        failed = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+    assert failed.status_code == 503
+    assert not fake_redis.exists("auth:refresh:used:" + hash_refresh_token(refresh_token))
+    retried = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert retried.status_code == 200
+    reused = client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert reused.status_code == 401
@@ -0,0 +1,354 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from app import cache, cache_codecs
+
+
+@pytest.fixture()
+def redis_client(monkeypatch):
+    monkeypatch.setattr(cache, "Redis", fakeredis.FakeRedis)
+    monkeypatch.setattr(cache, "AsyncRedis", fakeredis.aioredis.FakeRedis)
+    monkeypatch.setattr(cache, "_async_cache_client", None)
+    monkeypatch.setattr(cache, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(cache, "_cache_client", None)
+    monkeypatch.setattr(cache, "_invalidation_listener", None)
+    monkeypatch.setattr(cache, "redis_breaker", cache.CircuitBreaker(3, 5, 60))
+    cache.local_cache.clear()
+    client = cache.get_cache_client()
+    client.flushall()
+    yield client
+    if cache._invalidation_listener is not None:
+        cache._invalidation_listener.stop()
+    cache.local_cache.clear()
+
+
+def wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_local_cache_evicts_least_recently_used_and_expired_entries():
+    local = cache.LocalCache(max_entries=2)
+    local.set("a", 1, ttl_seconds=60)
+    local.set("b", 2, ttl_seconds=60)
+    assert local.get("a") == 1
+    local.set("c", 3, ttl_seconds=60)
+
+    assert local.get("b") is None
+    assert local.get("a") == 1
+    assert local.get("c") == 3
+
+    local.set("short", 4, ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert local.get("short") is None
+
+
+def test_redis_hit_populates_local_tier(redis_client):
+    redis_client.setex("teacher:excursions", 60, json.dumps([{"id": 1}]))
+
+    assert cache.get_cached_response("teacher:excursions", endpoint="test") == [{"id": 1}]
+
+    redis_client.delete("teacher:excursions")
+    assert cache.get_cached_response("teacher:excursions", endpoint="test") == [{"id": 1}]
+
+
+def test_invalidation_from_another_worker_drops_local_entry(redis_client):
+    cache.set_cached_response("feature_flags:all", [{"name": "beta"}])
+    assert cache.local_cache.get("feature_flags:all") == [{"name": "beta"}]
+
+    other_worker = fakeredis.FakeRedis.from_url(cache.settings.redis_url, decode_responses=True)
+    other_worker.publish(
+        cache.settings.cache_invalidation_channel, json.dumps({"keys": ["feature_flags:all"]})
+    )
+
+    assert wait_for(lambda: cache.local_cache.get("feature_flags:all") is None)
+
+
+def test_local_tier_stays_empty_without_the_invalidation_listener(monkeypatch):
+    monkeypatch.setattr(cache, "REDIS_AVAILABLE", False)
+
+    cache.set_cached_response("teacher:excursions", [{"id": 1}])
+    asyncio.run(cache.aset("teacher:excursions:1", {"id": 1}))
+
+    assert cache.local_cache.get("teacher:excursions") is None
+    assert cache.local_cache.get("teacher:excursions:1") is None
+
+
+def test_reconnect_restarts_the_listener_while_the_old_thread_winds_down(redis_client):
+    cache.set_cached_response("feature_flags:all", [{"name": "beta"}])
+    old_listener = cache._invalidation_listener
+
+    cache._handle_listener_error(cache.RedisError("connection reset"), None, old_listener)
+    assert cache._invalidation_listener is None
+    assert cache.local_cache.get("feature_flags:all") is None
+
+    cache.set_cached_response("feature_flags:all", [{"name": "beta"}])
+    assert cache._invalidation_listener is not None
+    assert cache._invalidation_listener is not old_listener
+    assert cache.local_cache.get("feature_flags:all") == [{"name": "beta"}]
+    other_worker = fakeredis.FakeRedis.from_url(cache.settings.redis_url, decode_responses=True)
+    other_worker.publish(
+        cache.settings.cache_invalidation_channel, json.dumps({"keys": ["feature_flags:all"]})
+    )
+    assert wait_for(lambda: cache.local_cache.get("feature_flags:all") is None)
+
+
+def test_invalidate_cache_clears_both_tiers(redis_client):
+    cache.set_cached_response("teacher:excursions", [])
+    cache.invalidate_cache(["teacher:excursions"])
+
+    assert cache.local_cache.get("teacher:excursions") is None
+    assert redis_client.get("teacher:excursions") is None
+    assert cache.get_cached_response("teacher:excursions", endpoint="test") is None
+
+
+def test_concurrent_misses_run_the_builder_once(redis_client):
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.1)
+        return ["fresh"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(
+            pool.map(
+                lambda _: cache.get_or_set_cached_response("teacher:excursions", "test", build),
+                range(8),
+            )
+        )
+
+    assert results == [["fresh"]] * 8
+    assert len(calls) == 1
+
+
+def test_stale_value_is_served_while_another_worker_rebuilds(redis_client):
+    redis_client.setex("teacher:excursions", 30, json.dumps(["stale"]))
+    redis_client.set("lock:teacher:excursions", "other-worker")
+
+    def build():
+        raise AssertionError("builder must not run while another worker holds the lock")
+
+    value = cache.get_or_set_cached_response(
+        "teacher:excursions", "test", build, stale_ttl_seconds=60
+    )
+
+    assert value == ["stale"]
+
+
+def test_stale_value_is_rebuilt_by_the_lock_owner(redis_client):
+    redis_client.setex("teacher:excursions", 30, json.dumps(["stale"]))
+
+    value = cache.get_or_set_cached_response(
+        "teacher:excursions", "test", lambda: ["fresh"], ttl_seconds=60, stale_ttl_seconds=60
+    )
+
+    assert value == ["fresh"]
+    assert cache.serializer.loads(redis_client.get("teacher:excursions")) == ["fresh"]
+    assert redis_client.get("lock:teacher:excursions") is None
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    breaker = cache.CircuitBreaker(failure_threshold=2, probe_interval=0.05, max_probe_interval=1)
+
+    breaker.record_failure()
+    assert breaker.state == breaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert breaker.state == breaker.HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN
+    time.sleep(0.06)
+    assert not breaker.allow_request()
+    time.sleep(0.05)
+    assert breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_half_open_probe_without_an_outcome_is_replaced():
+    breaker = cache.CircuitBreaker(failure_threshold=1, probe_interval=0.05, max_probe_interval=1)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert breaker.state == breaker.HALF_OPEN
+
+
+def test_cached_build_after_the_retry_time_closes_the_circuit(redis_client, monkeypatch):
+    monkeypatch.setattr(cache, "redis_breaker", cache.CircuitBreaker(1, 0.05, 1))
+    cache.redis_breaker.record_failure()
+    time.sleep(0.06)
+
+    value = cache.get_or_set_cached_response("teacher:excursions", "test", lambda: ["fresh"])
+
+    assert value == ["fresh"]
+    assert cache.redis_breaker.state == cache.CircuitBreaker.CLOSED
+    assert cache.serializer.loads(redis_client.get("teacher:excursions")) == ["fresh"]
+    assert redis_client.get("lock:teacher:excursions") is None
+
+
+@pytest.mark.parametrize(
+    "probe",
+    [
+        lambda: cache._acquire_build_lock("teacher:excursions"),
+        lambda: cache._release_build_lock("teacher:excursions", "token"),
+        lambda: asyncio.run(cache._aacquire_build_lock("teacher:excursions")),
+        lambda: asyncio.run(cache._arelease_build_lock("teacher:excursions", "token")),
+        cache.redis_available,
+    ],
+    ids=["lock", "unlock", "async-lock", "async-unlock", "availability"],
+)
+def test_every_probe_reports_its_outcome(redis_client, monkeypatch, probe):
+    monkeypatch.setattr(cache, "_async_cache_client", None)
+    monkeypatch.setattr(cache, "redis_breaker", cache.CircuitBreaker(1, 0.05, 1))
+    cache.redis_breaker.record_failure()
+    time.sleep(0.06)
+
+    probe()
+
+    assert cache.redis_breaker.state == cache.CircuitBreaker.CLOSED
+
+
+def test_open_circuit_skips_redis_without_reconnecting(monkeypatch):
+    attempts = []
+
+    class UnreachableRedis:
+        @classmethod
+        def from_url(cls, *args, **kwargs):
+            attempts.append(1)
+            raise cache.RedisError("connection refused")
+
+    monkeypatch.setattr(cache, "Redis", UnreachableRedis)
+    monkeypatch.setattr(cache, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(cache, "_cache_client", None)
+    monkeypatch.setattr(cache, "redis_breaker", cache.CircuitBreaker(1, 60, 60))
+    cache.local_cache.clear()
+
+    assert cache.get_cached_response("teacher:excursions", endpoint="test") is None
+    assert cache.get_cached_response("teacher:excursions", endpoint="test") is None
+    cache.set_cached_response("teacher:excursions", [])
+
+    assert len(attempts) == 1
+    assert cache.redis_breaker.state == cache.CircuitBreaker.OPEN
+    cache.local_cache.clear()
+
+
+def test_batch_api_reads_writes_and_invalidates_in_bulk(redis_client):
+    cache.set_many({"teacher:excursions:1": {"id": 1}, "teacher:excursions:2": {"id": 2}})
+    assert redis_client.ttl("teacher:excursions:1") > 0
+
+    found = cache.get_many(
+        ["teacher:excursions:1", "teacher:excursions:2", "teacher:excursions:3"], endpoint="test"
+    )
+    assert found == {"teacher:excursions:1": {"id": 1}, "teacher:excursions:2": {"id": 2}}
+
+    cache.invalidate_many(["teacher:excursions:1", "teacher:excursions:2"], batch_size=1)
+    assert cache.get_many(["teacher:excursions:1", "teacher:excursions:2"], endpoint="test") == {}
+
+
+def test_invalidate_tags_drops_every_tagged_entry(redis_client):
+    cache.set_cached_response("teacher:excursions", [{"id": 42}], tags=["excursions"])
+    cache.set_cached_response("teacher:excursions?class=5A", [{"id": 42}], tags=["excursions"])
+    cache.set_many(
+        {"teacher:excursions:42": {"id": 42}, "teacher:excursions:7": {"id": 7}},
+        tags={"teacher:excursions:42": ["excursion:42"], "teacher:excursions:7": ["excursion:7"]},
+    )
+
+    cache.invalidate_tags(["excursion:42", "excursions"])
+
+    assert cache.local_cache.get("teacher:excursions") is None
+    assert redis_client.get("teacher:excursions") is None
+    assert redis_client.get("teacher:excursions?class=5A") is None
+    assert redis_client.get("teacher:excursions:42") is None
+    assert redis_client.get("teacher:excursions:7") is not None
+    assert not redis_client.exists("cache:tag:excursions")
+
+
+def test_invalidate_tags_without_redis_clears_local_tier(monkeypatch):
+    monkeypatch.setattr(cache, "REDIS_AVAILABLE", False)
+    cache.local_cache.clear()
+    cache.local_cache.set("feature_flags:all", [], 60, tags=["feature_flags"])
+
+    cache.invalidate_tags(["feature_flags"])
+
+    assert cache.local_cache.get("feature_flags:all") is None
+
+
+@pytest.mark.parametrize("codec", sorted(cache_codecs.CODECS))
+@pytest.mark.parametrize("compression", sorted(cache_codecs.COMPRESSIONS))
+def test_serializer_round_trips_every_codec(codec, compression):
+    serializer = cache_codecs.CacheSerializer(codec, compression, compression_min_bytes=64)
+    value = [{"id": i, "location": "Музей", "price": None} for i in range(20)]
+
+    payload = serializer.dumps(value)
+
+    assert payload[0] < 0x20
+    assert cache_codecs.CacheSerializer("json", "none", 0).loads(payload) == value
+
+
+def test_serializer_reads_legacy_json_and_rejects_unknown_headers():
+    serializer = cache_codecs.CacheSerializer("msgpack", "zlib", compression_min_bytes=1024)
+
+    assert serializer.loads('[{"id": 1}]') == [{"id": 1}]
+    with pytest.raises(ValueError):
+        serializer.loads(b"\x07garbage")
+
+
+def test_async_path_shares_entries_with_the_sync_path(redis_client):
+    async def scenario():
+        await cache.aset("feature_flags:all", [{"name": "beta"}], tags=["feature_flags"])
+        cache.local_cache.clear()
+        assert await cache.aget("feature_flags:all", endpoint="test") == [{"name": "beta"}]
+
+        await cache.ainvalidate_tags(["feature_flags"])
+        assert await cache.aget("feature_flags:all", endpoint="test") is None
+
+        await cache.aset("teacher:excursions", [])
+        await cache.ainvalidate(["teacher:excursions"])
+
+    asyncio.run(scenario())
+
+    assert redis_client.get("teacher:excursions") is None
+    assert not redis_client.exists("cache:tag:feature_flags")
+
+
+def test_async_concurrent_misses_run_the_builder_once(redis_client):
+    calls = []
+
+    async def build():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["fresh"]
+
+    async def scenario():
+        return await asyncio.gather(
+            *[
+                cache.aget_or_set_cached_response("teacher:excursions", "test", build)
+                for _ in range(8)
+            ]
+        )
+
+    assert asyncio.run(scenario()) == [["fresh"]] * 8
+    assert len(calls) == 1
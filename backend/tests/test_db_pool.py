@@ -0,0 +1,38 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc
+
+from app.core.config import get_settings
+from app.db_pool import InstrumentedQueuePool, engine_options, instrument_pool
+
+
+def sample(name: str, pool: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": pool}) or 0.0
+
+
+def test_in_memory_sqlite_keeps_the_default_pool():
+    assert engine_options("sqlite://", "memory") == {}
+
+
+def test_pool_settings_and_metrics(tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "db_pool_size", 1)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    monkeypatch.setattr(settings, "db_pool_timeout_seconds", 0.05)
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, **engine_options(url, "test-pool"))
+    instrument_pool(engine)
+    checkouts = sample("db_pool_checkout_seconds_count", "test-pool")
+    timeouts = sample("db_pool_checkout_timeouts_total", "test-pool")
+
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    with engine.connect():
+        assert sample("db_pool_checked_out", "test-pool") == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    assert sample("db_pool_checked_out", "test-pool") == 0
+    assert sample("db_pool_size", "test-pool") == 1
+    assert sample("db_pool_checkout_seconds_count", "test-pool") == checkouts + 2
+    assert sample("db_pool_checkout_timeouts_total", "test-pool") == timeouts + 1
+    engine.dispose()
@@ -0,0 +1,82 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base
+from app.db_routing import PIN_COOKIE, DatabaseRoutingMiddleware, ReplicaSet, RoutingSession
+
+
+@pytest.fixture()
+def routed_sessions(tmp_path):
+    # The replica never receives the primary's writes, which makes the chosen bind visible.
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(
+                models.FeatureFlag.__table__.insert(), {"name": name, "enabled": True}
+            )
+    yield sessionmaker(bind=primary, class_=RoutingSession, replicas=ReplicaSet([replica]))
+    primary.dispose()
+    replica.dispose()
+
+
+def flag_names(session) -> list[str]:
+    return [flag.name for flag in session.query(models.FeatureFlag).order_by(models.FeatureFlag.id)]
+
+
+def test_sessions_marked_read_only_use_the_replica(routed_sessions):
+    with routed_sessions(info={"read_only": True}) as session:
+        assert flag_names(session) == ["replica"]
+
+    with routed_sessions() as session:
+        assert flag_names(session) == ["primary"]
+
+
+def test_session_sticks_to_the_primary_after_writing(routed_sessions):
+    with routed_sessions(info={"read_only": True}) as session:
+        session.add(models.FeatureFlag(name="new", enabled=False))
+        session.commit()
+
+        assert flag_names(session) == ["primary", "new"]
+
+
+def test_replica_set_round_robins():
+    engines = [create_engine("sqlite://"), create_engine("sqlite://")]
+    replicas = ReplicaSet(engines)
+
+    assert [replicas.next() for _ in range(4)] == engines * 2
+
+
+def test_get_requests_read_replicas_until_the_client_writes(routed_sessions):
+    app = FastAPI()
+    app.add_middleware(DatabaseRoutingMiddleware, sticky_seconds=5)
+
+    def get_session():
+        with routed_sessions() as session:
+            yield session
+
+    @app.get("/flags")
+    def read_flags(db=Depends(get_session)):
+        return flag_names(db)
+
+    @app.post("/flags")
+    def add_flag(db=Depends(get_session)):
+        db.add(models.FeatureFlag(name="new", enabled=True))
+        db.commit()
+        return flag_names(db)
+
+    with TestClient(app) as client:
+        assert client.get("/flags").json() == ["replica"]
+
+        written = client.post("/flags")
+        assert written.json() == ["primary", "new"]
+        assert PIN_COOKIE in written.cookies
+
+        assert client.get("/flags").json() == ["primary", "new"]
+        client.cookies.clear()
+        assert client.get("/flags").json() == ["replica"]
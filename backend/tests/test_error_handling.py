@@ -1,6 +1,10 @@
+import sqlite3
+
 from fastapi import Body, HTTPException
 from fastapi.testclient import TestClient
 from pydantic import BaseModel
+from sqlalchemy.exc import OperationalError
+
 from app.main import app
 
 
@@ -23,6 +27,13 @@ def raise_unhandled_exception():
     raise RuntimeError("Unexpected failure")
 
 
+@app.post("/tests/locked")
+def raise_database_locked():
+    raise OperationalError(
+        "INSERT INTO signatures", {}, sqlite3.OperationalError("database is locked")
+    )
+
+
 def test_http_exception_returns_structured_error():
     client = TestClient(app)
 
@@ -60,3 +71,17 @@ def test_unhandled_exception_is_transformed():
         "message": "Internal server error",
         "details": None,
     }
+
+
+def test_locked_database_asks_the_client_to_retry():
+    client = TestClient(app)
+
+    response = client.post("/tests/locked")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json() == {
+        "code": "service_unavailable",
+        "message": "Database is busy, please retry",
+        "details": None,
+    }
@@ -3,9 +3,11 @@ from fastapi.testclient import TestClient
 from app import models
 from app.db import SessionLocal
 from app.main import app
+from app.seeding import prepare_database
 
 
 def setup_function():
+    prepare_database()
     with SessionLocal() as db:
         db.query(models.Feedback).delete()
         db.commit()
@@ -0,0 +1,84 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app import utils
+from app.services import hashing
+
+
+def observed(operation: str) -> float:
+    return REGISTRY.get_sample_value("password_hash_seconds_count", {"operation": operation}) or 0
+
+
+@pytest.fixture(params=[0, 1], ids=["inline", "process-pool"])
+def workers(request, monkeypatch):
+    monkeypatch.setattr(hashing.settings, "password_hash_workers", request.param)
+    yield request.param
+    hashing.shutdown_executor()
+
+
+def test_hash_and_verify_round_trip(workers):
+    hashes, verifies = observed("hash"), observed("verify")
+
+    hashed = hashing.hash_password("secret123")
+
+    assert (hashing.get_executor() is None) == (workers == 0)
+    assert utils.verify_password("secret123", hashed)
+    assert hashing.verify_password("secret123", hashed)
+    assert not hashing.verify_password("wrong", hashed)
+    assert observed("hash") == hashes + 1
+    assert observed("verify") == verifies + 2
+
+
+def test_async_wrappers(workers):
+    async def run():
+        hashed = await hashing.ahash_password("secret123")
+        return await asyncio.gather(
+            hashing.averify_password("secret123", hashed),
+            hashing.averify_password("wrong", hashed),
+        )
+
+    assert asyncio.run(run()) == [True, False]
+    assert REGISTRY.get_sample_value("password_hash_in_flight") == 0
+
+
+def break_pool() -> None:
+    with pytest.raises(BrokenProcessPool):
+        hashing.get_executor().submit(os._exit, 1).result()
+
+
+def test_broken_pool_is_replaced(monkeypatch):
+    monkeypatch.setattr(hashing.settings, "password_hash_workers", 1)
+    try:
+        break_pool()
+        broken = hashing.get_executor()
+
+        hashed = hashing.hash_password("secret123")
+
+        assert hashing.get_executor() is not broken
+        break_pool()
+        assert asyncio.run(hashing.averify_password("secret123", hashed))
+    finally:
+        hashing.shutdown_executor()
+
+
+def test_hash_many_closed_early_cancels_queued_hashes(monkeypatch):
+    shutdowns = []
+
+    class RecordingExecutor(hashing.ProcessPoolExecutor):
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            shutdowns.append({"wait": wait, "cancel_futures": cancel_futures})
+            super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    monkeypatch.setattr(hashing, "ProcessPoolExecutor", RecordingExecutor)
+    hashes = hashing.hash_many(["secret123"] * 16, workers=2)
+    assert utils.verify_password("secret123", next(hashes))
+
+    hashes.close()
+
+    assert shutdowns == [{"wait": False, "cancel_futures": True}]
+    assert list(hashing.hash_many(["a", "b"], workers=2))[1].startswith("$pbkdf2")
+    assert shutdowns[-1] == {"wait": True, "cancel_futures": False}
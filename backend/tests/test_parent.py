@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+from app import models
+from app.services import storage
+from app.services.auth import ensure_role
+from app.utils import create_access_token
+
+
+def headers_for(db_session, email: str, role: models.UserRole) -> dict:
+    user = models.User(email=email, password_hash="hashed", role=ensure_role(db_session, role))
+    db_session.add(user)
+    db_session.commit()
+    return {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+
+
+@pytest.fixture()
+def signatures_path(db_session):
+    excursion = models.Excursion(
+        student_class="5А", date=date(2024, 9, 15), location="Планетарий", created_by=1
+    )
+    student = models.Student(name="Аня", student_class="5А", parent_email="mom@example.com")
+    db_session.add_all([excursion, student])
+    db_session.commit()
+    return f"{excursion.id}/{student.id}"
+
+
+def test_signature_list_is_cached_per_role(client, db_session, signatures_path, fake_redis):
+    parent = headers_for(db_session, "mom@example.com", models.UserRole.parent)
+    admin = headers_for(db_session, "admin@example.com", models.UserRole.admin)
+
+    assert client.get(f"/parent/signatures/{signatures_path}", headers=parent).json() == []
+    assert client.get(f"/parent/signatures/{signatures_path}", headers=admin).json() == []
+
+    keys = sorted(key.decode() for key in fake_redis.keys("route:parent_signatures:*"))
+    path = f"/parent/signatures/{signatures_path}"
+    assert keys == [
+        f"route:parent_signatures:admin:{path}",
+        f"route:parent_signatures:parent:{path}",
+    ]
+
+
+def test_new_signature_is_listed_right_after_signing(
+    client, db_session, signatures_path, fake_redis, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(storage.settings, "pdf_storage_root", str(tmp_path / "archive"))
+    parent = headers_for(db_session, "mom@example.com", models.UserRole.parent)
+    assert client.get(f"/parent/signatures/{signatures_path}", headers=parent).json() == []
+
+    signed = client.post(
+        f"/parent/sign/{signatures_path}",
+        json={"mode": "vector", "strokes": [[0, 0], [1, 1]]},
+        headers=parent,
+    )
+
+    assert signed.status_code == 200
+    listed = client.get(f"/parent/signatures/{signatures_path}", headers=parent)
+    assert [item["id"] for item in listed.json()] == [signed.json()["id"]]
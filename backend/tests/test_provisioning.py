@@ -0,0 +1,205 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app import models, provisioning
+from app.db import Base, get_db
+from app.main import app
+from app.routes import admin
+from app.services.auth import ensure_role
+from app.utils import create_access_token, verify_password
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autoflush=False, bind=engine)
+
+
+@pytest.fixture()
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add(
+        models.User(
+            email="Known@example.com",
+            password_hash="-",
+            role=ensure_role(session, models.UserRole.parent),
+        )
+    )
+    session.add_all(
+        [
+            models.Student(name="Аня", student_class="5А", parent_email="mom@example.com"),
+            models.Student(name="Боря", student_class="5А", parent_email=" MOM@example.com "),
+            models.Student(name="Вика", student_class="6Б", parent_email="dad@example.com"),
+            models.Student(name="Гоша", student_class="6Б", parent_email="known@example.com"),
+            models.Student(name="Даша", student_class="7В", parent_email=None),
+            models.Student(name="Егор", student_class="7В", parent_email=""),
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_missing_parent_emails_are_distinct_and_case_insensitive(db):
+    assert provisioning.missing_parent_emails(db) == ["dad@example.com", "mom@example.com"]
+
+
+def test_provisioning_creates_parents_once(db):
+    events = list(provisioning.provision_parents(db, workers=1))
+
+    assert events[0] == {"event": "start", "missing": 2}
+    assert {"event": "hashed", "done": 2, "total": 2} in events
+    created = {event["email"]: event["password"] for event in events if event["event"] == "created"}
+    assert set(created) == {"dad@example.com", "mom@example.com"}
+    assert events[-1]["event"] == "done"
+    assert events[-1]["created"] == 2
+    for email, password in created.items():
+        user = db.scalars(select(models.User).filter_by(email=email)).one()
+        assert user.role.name == models.UserRole.parent
+        assert user.token_version == 0
+        assert verify_password(password, user.password_hash)
+
+    rerun = list(provisioning.provision_parents(db, workers=1))
+    assert rerun == [
+        {"event": "start", "missing": 0},
+        {"event": "done", "created": 0, "skipped": 0, "seconds": 0.0},
+    ]
+
+
+def test_concurrently_registered_emails_are_skipped(db, monkeypatch):
+    missing = provisioning.missing_parent_emails(db)
+    db.add(
+        models.User(
+            email="dad@example.com",
+            password_hash="-",
+            role=ensure_role(db, models.UserRole.parent),
+        )
+    )
+    db.commit()
+    monkeypatch.setattr(provisioning, "missing_parent_emails", lambda session: missing)
+
+    events = list(provisioning.provision_parents(db, workers=1))
+
+    assert [event["email"] for event in events if event["event"] == "created"] == [
+        "mom@example.com"
+    ]
+    assert events[-1]["skipped"] == 1
+
+
+def test_other_writes_proceed_while_passwords_are_hashed(tmp_path, monkeypatch):
+    # One connection, as for the SQLite writer pool: a held transaction blocks everyone else.
+    single = create_engine(
+        f"sqlite:///{tmp_path / 'provisioning.db'}",
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.5,
+    )
+    Base.metadata.create_all(bind=single)
+    SingleSession = sessionmaker(autoflush=False, bind=single)
+
+    def hash_while_a_teacher_writes(passwords, _):
+        with SingleSession() as other:
+            other.add(models.Student(name="Жора", student_class="7В", parent_email=None))
+            other.commit()
+        yield from ["-"] * len(passwords)
+
+    monkeypatch.setattr(provisioning, "hash_many", hash_while_a_teacher_writes)
+    with SingleSession() as session:
+        ensure_role(session, models.UserRole.parent)
+        session.add(models.Student(name="Аня", student_class="5А", parent_email="mom@example.com"))
+        session.commit()
+
+        events = list(provisioning.provision_parents(session, workers=1))
+
+        assert events[-1]["created"] == 1
+        assert session.scalar(select(models.Student.id).filter_by(name="Жора")) is not None
+    single.dispose()
+
+
+class RecordingSession(Session):
+    closed = False
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+def fake_hash_many(passwords, _, finished=None):
+    try:
+        yield from ["-"] * len(passwords)
+    finally:
+        if finished is not None:
+            finished.append(True)
+
+
+@pytest.fixture()
+def stream_sessions(monkeypatch):
+    """Sessions the provisioning stream opens for itself, on the test database."""
+    sessions = []
+
+    def factory():
+        session = RecordingSession(bind=engine, autoflush=False)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(admin, "SessionLocal", factory)
+    return sessions
+
+
+def test_endpoint_streams_ndjson_for_admins_only(db, monkeypatch, stream_sessions):
+    monkeypatch.setattr(provisioning, "hash_many", fake_hash_many)
+    admin_user = models.User(
+        email="admin@example.com",
+        password_hash="-",
+        role=ensure_role(db, models.UserRole.admin),
+    )
+    db.add(admin_user)
+    db.commit()
+    parent = db.scalars(select(models.User).filter_by(email="Known@example.com")).one()
+    url = "/admin/parents/provision"
+    admin_headers = {"Authorization": f"Bearer {create_access_token(str(admin_user.id))}"}
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        with TestClient(app) as client:
+            forbidden = client.post(
+                url,
+                params={"reveal_passwords": "true"},
+                headers={"Authorization": f"Bearer {create_access_token(str(parent.id))}"},
+            )
+            unconfirmed = client.post(url, headers=admin_headers)
+            response = client.post(url, params={"reveal_passwords": "true"}, headers=admin_headers)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert forbidden.status_code == 403
+    assert unconfirmed.status_code == 400
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["cache-control"] == "no-store"
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["start", "hashed", "created", "created", "done"]
+    assert len(stream_sessions) == 1
+    assert stream_sessions[0].closed
+
+
+def test_stream_closed_early_closes_the_job_and_its_session(db, monkeypatch, stream_sessions):
+    finished = []
+    monkeypatch.setattr(
+        provisioning,
+        "hash_many",
+        lambda passwords, workers: fake_hash_many(passwords, workers, finished),
+    )
+    stream = admin._provision_stream()
+    assert json.loads(next(stream)) == {"event": "start", "missing": 2}
+    next(stream)
+
+    stream.close()
+
+    assert finished == [True]
+    assert stream_sessions[0].closed
+    assert db.scalar(select(models.User).filter_by(email="mom@example.com")) is None
@@ -0,0 +1,303 @@
+import importlib.util
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.db import Base
+from app.services.auth import hash_refresh_token
+from app.services.excursions import encode_cursor, excursion_page_query
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "app/alembic/versions"
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, statement) -> str:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as connection:
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize(
+    ("statement", "index"),
+    [
+        (
+            select(models.Signature).filter_by(excursion_id=1, student_id=2),
+            "ix_signatures_excursion_id_student_id",
+        ),
+        (
+            select(models.Excursion).order_by(
+                models.Excursion.created_at.desc(), models.Excursion.id.desc()
+            ),
+            "ix_excursions_created_at_id",
+        ),
+        (
+            select(models.Excursion)
+            .filter_by(student_class="5А")
+            .order_by(models.Excursion.created_at.desc(), models.Excursion.id.desc()),
+            "ix_excursions_student_class_created_at_id",
+        ),
+        (
+            excursion_page_query(
+                cursor=encode_cursor(
+                    models.Excursion(id=7, date=date(2024, 9, 2), created_at=datetime(2024, 9, 1))
+                )
+            ),
+            "ix_excursions_created_at_id",
+        ),
+        (
+            excursion_page_query(student_class="5А"),
+            "ix_excursions_student_class_created_at_id",
+        ),
+        (
+            excursion_page_query(date_from=date(2024, 9, 1), date_to=date(2024, 9, 30)),
+            "ix_excursions_date_id",
+        ),
+        (
+            excursion_page_query(
+                student_class="5А",
+                date_from=date(2024, 9, 1),
+                cursor=encode_cursor(
+                    models.Excursion(id=7, date=date(2024, 9, 2), created_at=datetime(2024, 8, 1))
+                ),
+            ),
+            "ix_excursions_student_class_date_id",
+        ),
+        (select(models.Student).filter_by(student_class="5А"), "ix_students_student_class"),
+        (
+            select(models.Student).filter_by(parent_email="parent@example.com"),
+            "ix_students_parent_email",
+        ),
+        (
+            select(models.RefreshToken).filter_by(token_hash="ab" * 32),
+            "ix_refresh_tokens_token_hash",
+        ),
+        (
+            select(models.RefreshToken.id).filter_by(family_id="f" * 32),
+            "ix_refresh_tokens_family_id",
+        ),
+        (
+            select(models.RefreshToken.id).where(models.RefreshToken.revoked).limit(1000),
+            "ix_refresh_tokens_revoked_id",
+        ),
+        (
+            select(models.RefreshToken).where(
+                models.RefreshToken.expires_at < datetime(2024, 9, 1)
+            ),
+            "ix_refresh_tokens_expires_at",
+        ),
+    ],
+)
+def test_hot_queries_use_an_index(engine, statement, index):
+    plan = query_plan(engine, statement)
+
+    assert index in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def run_migration(engine, filename: str, direction: str) -> None:
+    spec = importlib.util.spec_from_file_location(filename, MIGRATIONS / filename)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with engine.begin() as connection:
+        with Operations.context(MigrationContext.configure(connection)):
+            getattr(migration, direction)()
+
+
+def test_migration_adds_missing_indexes_and_skips_missing_tables():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_signatures_excursion_id_student_id"))
+        connection.execute(text("DROP TABLE refresh_tokens"))
+
+    run_migration(engine, "0002_hot_path_indexes.py", "upgrade")
+    run_migration(engine, "0002_hot_path_indexes.py", "upgrade")
+
+    signature_indexes = {index["name"] for index in inspect(engine).get_indexes("signatures")}
+    assert "ix_signatures_excursion_id_student_id" in signature_indexes
+
+    run_migration(engine, "0002_hot_path_indexes.py", "downgrade")
+    assert not inspect(engine).get_indexes("signatures")
+    engine.dispose()
+
+
+def legacy_excursions_engine(dates: list[str]):
+    """Database whose ``excursions.date`` is still the pre-0003 free-form string."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    legacy = MetaData()
+    Table(
+        "excursions",
+        legacy,
+        Column("id", Integer, primary_key=True),
+        Column("student_class", String, nullable=False),
+        Column("date", String, nullable=False),
+        Column("location", String, nullable=False),
+        Column("created_by", Integer, nullable=False),
+        Column("created_at", DateTime),
+    )
+    legacy.create_all(engine)
+    with engine.begin() as connection:
+        for value in dates:
+            connection.execute(
+                text(
+                    "INSERT INTO excursions (student_class, date, location, created_by) "
+                    "VALUES ('5А', :date, 'Музей', 1)"
+                ),
+                {"date": value},
+            )
+    return engine
+
+
+def test_date_migration_parses_existing_strings_and_round_trips():
+    engine = legacy_excursions_engine(["2024-09-15", " 16.09.2024", "2024-09-17T10:00:00"])
+
+    run_migration(engine, "0003_excursion_date_column.py", "upgrade")
+
+    columns = {column["name"]: column for column in inspect(engine).get_columns("excursions")}
+    assert isinstance(columns["date"]["type"], Date)
+    assert not columns["date"]["nullable"]
+    with engine.connect() as connection:
+        dates = connection.scalars(
+            select(Table("excursions", MetaData(), autoload_with=connection).c.date)
+        ).all()
+    assert dates == [date(2024, 9, 15), date(2024, 9, 16), date(2024, 9, 17)]
+    index_names = {index["name"] for index in inspect(engine).get_indexes("excursions")}
+    assert {"ix_excursions_date_id", "ix_excursions_student_class_date_id"} <= index_names
+
+    run_migration(engine, "0003_excursion_date_column.py", "downgrade")
+
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT date FROM excursions ORDER BY id")).scalars().all()
+    assert rows == ["2024-09-15", "2024-09-16", "2024-09-17"]
+    engine.dispose()
+
+
+def test_date_migration_refuses_unparseable_values():
+    engine = legacy_excursions_engine(["2024-09-15", "next Friday"])
+
+    with pytest.raises(ValueError, match=r"ids \[2\]"):
+        run_migration(engine, "0003_excursion_date_column.py", "upgrade")
+    engine.dispose()
+
+
+def test_token_version_migration_adds_the_column_once():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    legacy = MetaData()
+    Table(
+        "users",
+        legacy,
+        Column("id", Integer, primary_key=True),
+        Column("email", String, nullable=False),
+    )
+    legacy.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (email) VALUES ('old@example.com')"))
+
+    run_migration(engine, "0004_user_token_version.py", "upgrade")
+    run_migration(engine, "0004_user_token_version.py", "upgrade")
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT token_version FROM users")).scalar() == 0
+    run_migration(engine, "0004_user_token_version.py", "downgrade")
+    columns = {column["name"] for column in inspect(engine).get_columns("users")}
+    assert "token_version" not in columns
+    engine.dispose()
+
+
+def test_refresh_token_migration_hashes_existing_tokens():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    legacy = MetaData()
+    Table(
+        "refresh_tokens",
+        legacy,
+        Column("id", Integer, primary_key=True),
+        Column("token", String, unique=True, index=True, nullable=False),
+        Column("user_id", Integer, nullable=False),
+        Column("expires_at", DateTime, nullable=False),
+        Column("revoked", Boolean, default=False),
+    )
+    legacy.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO refresh_tokens (token, user_id, expires_at, revoked) "
+                "VALUES ('live-token', 1, '2030-01-01', 0)"
+            )
+        )
+
+    run_migration(engine, "0005_refresh_token_hash.py", "upgrade")
+    run_migration(engine, "0005_refresh_token_hash.py", "upgrade")
+
+    with engine.connect() as connection:
+        stored = connection.execute(text("SELECT token_hash FROM refresh_tokens")).scalar()
+    assert stored == hash_refresh_token("live-token")
+    index_names = {index["name"] for index in inspect(engine).get_indexes("refresh_tokens")}
+    assert {"ix_refresh_tokens_token_hash", "ix_refresh_tokens_revoked_id"} <= index_names
+
+    run_migration(engine, "0005_refresh_token_hash.py", "downgrade")
+    columns = {column["name"] for column in inspect(engine).get_columns("refresh_tokens")}
+    assert "token" in columns and "token_hash" not in columns
+    engine.dispose()
+
+
+def test_token_family_migration_revokes_opaque_tokens():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    legacy = MetaData()
+    Table(
+        "refresh_tokens",
+        legacy,
+        Column("id", Integer, primary_key=True),
+        Column("token_hash", String(64), unique=True, index=True, nullable=False),
+        Column("user_id", Integer, nullable=False),
+        Column("expires_at", DateTime, nullable=False),
+        Column("revoked", Boolean, default=False),
+    )
+    legacy.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO refresh_tokens (token_hash, user_id, expires_at, revoked) "
+                "VALUES ('opaque', 1, '2030-01-01', 0)"
+            )
+        )
+
+    run_migration(engine, "0006_refresh_token_family.py", "upgrade")
+    run_migration(engine, "0006_refresh_token_family.py", "upgrade")
+
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT family_id, revoked FROM refresh_tokens")).one()
+    assert tuple(row) == (None, 1)
+    index_names = {index["name"] for index in inspect(engine).get_indexes("refresh_tokens")}
+    assert "ix_refresh_tokens_family_id" in index_names
+
+    run_migration(engine, "0006_refresh_token_family.py", "downgrade")
+    columns = {column["name"] for column in inspect(engine).get_columns("refresh_tokens")}
+    assert "family_id" not in columns and "token_hash" in columns
+    engine.dispose()
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base
+from app.query_stats import QueryStatsMiddleware, RepeatedQueryError
+
+
+@pytest.fixture()
+def app(tmp_path):
+    path = tmp_path / "stats.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as session:
+        session.add_all(models.FeatureFlag(name=f"flag-{i}", enabled=True) for i in range(5))
+        session.commit()
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async_session_factory = async_sessionmaker(async_engine)
+
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, repeat_threshold=3)
+
+    def get_session():
+        with session_factory() as session:
+            yield session
+
+    @app.get("/flags/{flag_id}")
+    def read_flag(flag_id: int, db=Depends(get_session)):
+        db.scalars(select(models.FeatureFlag)).all()
+        return db.get(models.FeatureFlag, flag_id).name
+
+    @app.get("/flags-one-by-one")
+    def read_flags_one_by_one(db=Depends(get_session)):
+        ids = db.scalars(select(models.FeatureFlag.id)).all()
+        return [db.scalars(select(models.FeatureFlag).filter_by(id=i)).one().name for i in ids]
+
+    @app.get("/async-flags")
+    async def read_flags_async():
+        async with async_session_factory() as session:
+            await session.scalars(select(models.FeatureFlag))
+            await asyncio.sleep(0)
+            return (await session.scalars(select(models.FeatureFlag.name))).all()
+
+    yield app
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+def test_requests_report_query_count_and_time(app):
+    before = (
+        REGISTRY.get_sample_value(
+            "http_request_db_queries_count", {"method": "GET", "route": "/flags/{flag_id}"}
+        )
+        or 0
+    )
+
+    with TestClient(app) as client:
+        response = client.get("/flags/2")
+        async_response = client.get("/async-flags")
+
+    assert response.json() == "flag-1"
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert response.headers["Server-Timing"].endswith('desc="2 queries"')
+    assert async_response.headers["Server-Timing"].endswith('desc="2 queries"')
+    after = REGISTRY.get_sample_value(
+        "http_request_db_queries_count", {"method": "GET", "route": "/flags/{flag_id}"}
+    )
+    assert after == before + 1
+
+
+def test_repeated_statement_fails_under_pytest(app):
+    with TestClient(app) as client:
+        with pytest.raises(RepeatedQueryError, match="more than 3 times"):
+            client.get("/flags-one-by-one")
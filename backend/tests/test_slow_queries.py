@@ -0,0 +1,134 @@
+from dataclasses import replace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models, slow_queries
+from app.core.config import get_settings
+from app.db import Base, get_db
+from app.main import app
+from app.services.auth import ensure_default_roles, ensure_role
+from app.slow_queries import redact_statement, setup_slow_query_log, slow_query_log
+from app.utils import create_access_token
+
+
+@pytest.fixture()
+def log_every_query():
+    setup_slow_query_log(
+        replace(get_settings(), slow_query_threshold_ms=0, slow_query_explain_sample_rate=1)
+    )
+    slow_query_log.clear()
+    yield slow_query_log
+    setup_slow_query_log(get_settings())
+    slow_query_log.clear()
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_slow_statements_are_redacted_and_explained(engine, log_every_query):
+    with Session(engine) as session:
+        session.scalars(select(models.Signature).filter_by(excursion_id=1, student_id=2)).all()
+        session.scalars(select(models.Signature).filter_by(pdf_path="/archive/secret.pdf")).all()
+
+    entries = log_every_query.top(10)
+    indexed = next(e for e in entries if "WHERE signatures.excursion_id" in e["statement"])
+    full_scan = next(e for e in entries if "WHERE signatures.pdf_path" in e["statement"])
+
+    assert indexed["parameters"] == ["<int>", "<int>"]
+    assert any("ix_signatures_excursion_id_student_id" in line for line in indexed["plan"])
+    assert full_scan["parameters"] == ["<str>"]
+    assert any(line.startswith("SCAN signatures") for line in full_scan["plan"])
+    assert all("secret" not in entry["statement"] for entry in entries)
+
+
+def test_top_groups_repeated_statements_and_ring_buffer_is_bounded(engine, log_every_query):
+    log_every_query.configure(threshold_ms=0, explain_sample_rate=0, max_entries=3)
+    with Session(engine) as session:
+        for excursion_id in range(5):
+            session.scalars(select(models.Signature).filter_by(excursion_id=excursion_id)).all()
+
+    (entry,) = log_every_query.top(10)
+    assert entry["count"] == 3
+    assert entry["plan"] is None
+
+
+def test_failed_explain_is_rolled_back_to_a_savepoint(engine, log_every_query, monkeypatch):
+    monkeypatch.setattr(slow_queries, "_EXPLAIN_PREFIXES", {"sqlite": "EXPLAIN NONSENSE"})
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as session:
+            session.add(models.Student(name="Аня", student_class="5А"))
+            session.flush()
+            session.scalars(select(models.Student).filter_by(student_class="5А")).all()
+            session.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert any(statement.startswith("ROLLBACK TO SAVEPOINT") for statement in statements)
+    with Session(engine) as session:
+        assert session.scalars(select(models.Student.name)).all() == ["Аня"]
+    assert all(entry["plan"] is None for entry in log_every_query.top(10))
+
+
+def test_redact_statement_drops_inline_literals():
+    assert redact_statement("SELECT * FROM users\n WHERE email = 'a''b@example.com'") == (
+        "SELECT * FROM users WHERE email = '?'"
+    )
+
+
+def test_slow_query_endpoint_is_admin_only(engine, log_every_query):
+    session = sessionmaker(bind=engine)()
+    ensure_default_roles(session)
+    users = {}
+    for role in (models.UserRole.admin, models.UserRole.teacher):
+        user = models.User(
+            email=f"{role.value}@example.com",
+            password_hash="hashed",
+            role=ensure_role(session, role),
+        )
+        session.add(user)
+        session.commit()
+        users[role] = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+
+    def override_get_db():
+        yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            forbidden = client.get("/admin/slow-queries", headers=users[models.UserRole.teacher])
+            response = client.get(
+                "/admin/slow-queries?limit=1", headers=users[models.UserRole.admin]
+            )
+    finally:
+        app.dependency_overrides.clear()
+        session.close()
+
+    assert forbidden.status_code == 403
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert set(response.json()[0]) == {
+        "statement",
+        "count",
+        "max_ms",
+        "mean_ms",
+        "last_seen",
+        "parameters",
+        "plan",
+    }
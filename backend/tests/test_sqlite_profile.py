@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+from sqlalchemy import exc, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.db import Base, create_sqlite_engine, is_sqlite_file
+from app.db_routing import ReplicaSet, RoutingSession
+
+
+@pytest.fixture()
+def sqlite_engines(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    writer = create_sqlite_engine(url, "test-writer", writer=True)
+    reader = create_sqlite_engine(url, "test-reader", writer=False)
+    Base.metadata.create_all(bind=writer)
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+def pragma(engine, name: str):
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_is_sqlite_file():
+    assert is_sqlite_file("sqlite:///./data.db")
+    assert not is_sqlite_file("sqlite://")
+    assert not is_sqlite_file("sqlite:///:memory:")
+    assert not is_sqlite_file("postgresql://user:pass@db/app")
+
+
+def test_connections_use_wal_and_tuned_pragmas(sqlite_engines):
+    writer, reader = sqlite_engines
+
+    assert pragma(writer, "journal_mode") == "wal"
+    assert pragma(writer, "synchronous") == 1  # NORMAL
+    assert pragma(writer, "busy_timeout") > 0
+    assert pragma(writer, "cache_size") < 0  # sized in KiB
+    assert pragma(writer, "query_only") == 0
+    assert pragma(reader, "query_only") == 1
+    assert writer.pool.size() == 1
+    assert writer.pool._max_overflow == 0
+
+
+def test_readers_cannot_write(sqlite_engines):
+    _, reader = sqlite_engines
+
+    with reader.connect() as connection:
+        with pytest.raises(exc.OperationalError, match="readonly"):
+            connection.execute(text("INSERT INTO roles (name) VALUES ('admin')"))
+
+
+def test_concurrent_writes_and_reads_do_not_lock(sqlite_engines):
+    writer, reader = sqlite_engines
+    factory = sessionmaker(bind=writer, class_=RoutingSession, replicas=ReplicaSet([reader]))
+    errors: list[Exception] = []
+
+    def write(index: int) -> None:
+        try:
+            with factory() as db:
+                db.add(models.Student(name=f"Ученик {index}", student_class="5А"))
+                db.commit()
+        except Exception as error:  # noqa: BLE001 - collected for the assertion below
+            errors.append(error)
+
+    def read() -> None:
+        try:
+            with factory(info={"read_only": True}) as db:
+                db.scalars(select(models.Student)).all()
+        except Exception as error:  # noqa: BLE001
+            errors.append(error)
+
+    threads = [threading.Thread(target=write, args=(index,)) for index in range(20)]
+    threads += [threading.Thread(target=read) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with factory(info={"read_only": True}) as db:
+        assert len(db.scalars(select(models.Student)).all()) == 20
+
+
+def test_second_writer_pool_waits_for_the_write_lock(sqlite_engines, tmp_path):
+    writer, _ = sqlite_engines
+    # The async engine has a writer pool of its own, so two writers share the file.
+    other_writer = create_sqlite_engine(
+        f"sqlite:///{tmp_path / 'profile.db'}", "test-other-writer", writer=True
+    )
+    errors: list[Exception] = []
+
+    def write_from_other_pool() -> None:
+        try:
+            with Session(other_writer) as db:
+                db.add(models.Student(name="Боря", student_class="5А"))
+                db.commit()
+        except Exception as error:  # noqa: BLE001 - collected for the assertion below
+            errors.append(error)
+
+    with Session(writer) as db:
+        db.add(models.Student(name="Аня", student_class="5А"))
+        db.flush()  # holds the write lock until the commit
+        thread = threading.Thread(target=write_from_other_pool)
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive()  # waiting in busy_timeout, not failed
+        db.commit()
+    thread.join()
+    other_writer.dispose()
+
+    assert errors == []
+    with Session(writer) as db:
+        assert sorted(db.scalars(select(models.Student.name))) == ["Аня", "Боря"]
@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import models, seeding
+
+BACKEND = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ["pandas", "openpyxl", "reportlab"]
+
+
+def test_importing_the_app_touches_neither_the_database_nor_heavy_libraries(tmp_path):
+    database = tmp_path / "untouched.db"
+    script = (
+        "import json, sys; import app.main; "
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{database}"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+    assert not database.exists()
+
+
+def test_prepare_database_seeds_once(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    monkeypatch.setattr(seeding, "engine", engine)
+    monkeypatch.setattr(seeding, "SessionLocal", sessionmaker(bind=engine, autoflush=False))
+
+    assert seeding.prepare_database() is True
+    assert seeding.prepare_database() is False
+
+    with seeding.SessionLocal() as db:
+        assert set(db.scalars(select(models.Role.name))) == set(models.UserRole)
+        flags = dict(db.execute(select(models.FeatureFlag.name, models.FeatureFlag.enabled)).all())
+    assert flags == seeding.get_settings().feature_flags
+    engine.dispose()
@@ -0,0 +1,184 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import models
+from app.cache import local_cache
+from app.cache_warmup import warm_cache
+from app.services.auth import ensure_role
+from app.utils import create_access_token
+
+
+@pytest.fixture()
+def teacher_headers(db_session):
+    teacher = models.User(
+        email="teacher@example.com",
+        password_hash="hashed",
+        role=ensure_role(db_session, models.UserRole.teacher),
+    )
+    db_session.add(teacher)
+    db_session.commit()
+    return {"Authorization": f"Bearer {create_access_token(str(teacher.id))}"}
+
+
+def create_excursion(client, location: str) -> dict:
+    response = client.post(
+        "/teacher/excursions",
+        json={"student_class": "5А", "date": "2024-09-15", "location": location},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_list_excursions_is_cached_until_an_excursion_is_created(
+    client, db_session, teacher_headers, fake_redis
+):
+    create_excursion(client, "Планетарий")
+    first = client.get("/teacher/excursions", headers=teacher_headers)
+    assert [item["location"] for item in first.json()["items"]] == ["Планетарий"]
+
+    db_session.add(
+        models.Excursion(
+            student_class="6Б", date=date(2024, 10, 1), location="Зоопарк", created_by=1
+        )
+    )
+    db_session.commit()
+    cached = client.get("/teacher/excursions", headers=teacher_headers)
+    assert cached.json() == first.json()
+
+    create_excursion(client, "Политехнический музей")
+    refreshed = client.get("/teacher/excursions", headers=teacher_headers)
+    assert len(refreshed.json()["items"]) == 3
+
+
+def test_excursion_detail_is_served_from_cache_and_404_is_not_cached(
+    client, db_session, teacher_headers
+):
+    excursion = create_excursion(client, "Планетарий")
+
+    response = client.get(f"/teacher/excursions/{excursion['id']}", headers=teacher_headers)
+    assert response.status_code == 200
+    assert response.json()["location"] == "Планетарий"
+
+    missing = client.get("/teacher/excursions/999", headers=teacher_headers)
+    assert missing.status_code == 404
+    assert client.get("/teacher/excursions/999", headers=teacher_headers).status_code == 404
+
+
+def test_cached_endpoint_still_enforces_roles(client, db_session):
+    parent = models.User(
+        email="parent@example.com",
+        password_hash="hashed",
+        role=ensure_role(db_session, models.UserRole.parent),
+    )
+    db_session.add(parent)
+    db_session.commit()
+
+    response = client.get(
+        "/teacher/excursions",
+        headers={"Authorization": f"Bearer {create_access_token(str(parent.id))}"},
+    )
+
+    assert response.status_code == 403
+
+
+def test_conditional_get_returns_304_until_the_list_changes(client, db_session, teacher_headers):
+    create_excursion(client, "Планетарий")
+    first = client.get("/teacher/excursions", headers=teacher_headers)
+    etag = first.headers["ETag"]
+
+    not_modified = client.get(
+        "/teacher/excursions", headers={**teacher_headers, "If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    create_excursion(client, "Зоопарк")
+    changed = client.get("/teacher/excursions", headers={**teacher_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()["items"]) == 2
+
+
+def test_warmed_detail_entry_matches_rendered_route(client, db_session, teacher_headers):
+    excursion = create_excursion(client, "Планетарий")
+    warmed = client.get(f"/teacher/excursions/{excursion['id']}", headers=teacher_headers)
+
+    local_cache.clear()
+    rendered = client.get(f"/teacher/excursions/{excursion['id']}", headers=teacher_headers)
+
+    assert warmed.headers["ETag"] == rendered.headers["ETag"]
+    assert warmed.json() == excursion
+
+
+def test_warm_cache_writes_entries_served_by_the_routes(
+    client, db_session, teacher_headers, fake_redis
+):
+    for location in ("Планетарий", "Зоопарк"):
+        db_session.add(
+            models.Excursion(
+                student_class="5А", date=date(2024, 9, 15), location=location, created_by=1
+            )
+        )
+    db_session.commit()
+
+    counts = warm_cache(db_session, excursion_limit=1)
+
+    assert counts == {"excursion_pages": 2, "excursion_details": 1, "feature_flags": 1}
+    local_cache.clear()
+    db_session.query(models.Excursion).delete()
+    db_session.commit()
+    response = client.get("/teacher/excursions", headers=teacher_headers)
+    assert [item["location"] for item in response.json()["items"]] == ["Зоопарк", "Планетарий"]
+    by_class = client.get("/teacher/excursions?student_class=5А", headers=teacher_headers)
+    assert len(by_class.json()["items"]) == 2
+
+
+def test_list_excursions_pages_with_a_cursor_and_filters(client, db_session, teacher_headers):
+    created_at = datetime(2024, 9, 1, 8, 30)
+    db_session.add_all(
+        models.Excursion(
+            student_class="5А" if i % 2 else "6Б",
+            date=date(2024, 10, 7 - i),
+            location=f"Музей {i}",
+            created_by=1,
+            # Pairs share a timestamp so the id tie-breaker is exercised.
+            created_at=created_at + timedelta(minutes=i // 2),
+        )
+        for i in range(7)
+    )
+    db_session.commit()
+
+    locations, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/teacher/excursions", params=params, headers=teacher_headers).json()
+        locations += [item["location"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert locations == [f"Музей {i}" for i in reversed(range(7))]
+
+    filtered = client.get(
+        "/teacher/excursions",
+        params={"student_class": "5А", "from": "2024-10-01", "to": "2024-10-06", "limit": 2},
+        headers=teacher_headers,
+    ).json()
+    assert [item["date"] for item in filtered["items"]] == ["2024-10-02", "2024-10-04"]
+    rest = client.get(
+        "/teacher/excursions",
+        params={
+            "student_class": "5А",
+            "from": "2024-10-01",
+            "to": "2024-10-06",
+            "limit": 2,
+            "cursor": filtered["next_cursor"],
+        },
+        headers=teacher_headers,
+    ).json()
+    assert [item["date"] for item in rest["items"]] == ["2024-10-06"]
+    assert rest["next_cursor"] is None
+
+    invalid = client.get("/teacher/excursions?cursor=not-a-cursor", headers=teacher_headers)
+    assert invalid.status_code == 400